@@ -86,9 +86,27 @@ def _fallback_rationale(row: Dict[str, object]) -> str:
         ),
         "Recommendation: prioritise for further review based on composite scoring and domain thresholds.",
     ]
+    pathway_summary = _pathway_summary(row)
+    if pathway_summary:
+        sections.insert(-1, f"Pathway context: {pathway_summary}.")
     return " \n".join(sections)
 
 
+def _pathway_summary(row: Dict[str, object]) -> Optional[str]:
+    """Describe offline pathway enrichment fields, if the row carries them."""
+
+    if "shared_pathway_count" not in row:
+        return None
+    pathways = row.get("shared_pathways") or []
+    summary = "{count} shared pathways (enrichment p={p:.3g})".format(
+        count=row.get("shared_pathway_count"),
+        p=row.get("pathway_enrichment_p", float("nan")),
+    )
+    if pathways:
+        summary += f", including {', '.join(str(name) for name in pathways)}"
+    return summary
+
+
 class AIAnalysisEngine:
     """Coordinate AI-driven rationale creation with graceful fallbacks."""
 
@@ -103,6 +121,17 @@ class AIAnalysisEngine:
                 LOGGER.warning("Disabling live AI analysis: %s", exc)
                 self.enable_api = False
 
+    def restore_api(self) -> bool:
+        """Re-enable live calls after an API error forced offline fallbacks.
+
+        Returns ``True`` when the engine had degraded and was restored.
+        """
+
+        if self._client is None or self.enable_api:
+            return False
+        self.enable_api = True
+        return True
+
     def generate_rationales(self, rows: Iterable[Dict[str, object]]) -> List[Rationale]:
         rationales: List[Rationale] = []
         batch: List[Dict[str, object]] = []
@@ -166,7 +195,7 @@ class AIAnalysisEngine:
 
     @staticmethod
     def _build_prompt(row: Dict[str, object]) -> str:
-        return (
+        prompt = (
             "Analyse the following gene pair. Provide a concise but detailed rationale covering statistical quality, "
             "biological plausibility, and clinical progression cues. Include a recommendation (proceed/review/reject).\n"
             f"Pair ID: {row.get('pair_id')}\n"
@@ -181,3 +210,7 @@ class AIAnalysisEngine:
             f"Composite score: {row.get('composite_score')}\n"
             f"Classification: {row.get('classification')}"
         )
+        pathway_summary = _pathway_summary(row)
+        if pathway_summary:
+            prompt += f"\nPathways: {pathway_summary}"
+        return prompt
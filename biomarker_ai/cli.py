@@ -1,30 +1,54 @@
 """CLI entry point for the biomarker AI analysis application."""
 from __future__ import annotations
 
+import importlib
 import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import pandas as pd
 import typer
 
 from .ai_analysis import AIAnalysisEngine
 from .config import AppConfig, dump_default_profiles, load_config
-from .data_processing import process_dataset
+from .diff import diff_runs, load_run_scores, write_diff_report
 from .logging_utils import configure_logging
 from .output import build_excel_report, write_flagged_rationales
+from .pipeline import AnalysisPipeline
+from .prefilter import PrefilterStats, read_prefiltered
+from .progress import ProgressTracker
+from .server import create_server
+from .store import RunStore, check_run_dir, save_run
 
 LOGGER = logging.getLogger(__name__)
 
 app = typer.Typer(add_completion=False, help="AI-driven biomarker analysis CLI")
 
 
-def _load_dataset(path: Path) -> pd.DataFrame:
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def _require_pyarrow(path: Path) -> None:
+    try:
+        importlib.import_module("pyarrow.compute")
+    except ImportError as exc:
+        raise typer.BadParameter(
+            f"Reading Parquet file {path} requires pyarrow; install it with `pip install biomarker-ai[parquet]`"
+        ) from exc
+
+
+def _load_dataset(path: Path, config: AppConfig) -> Tuple[pd.DataFrame, Optional[PrefilterStats]]:
     if not path.exists():
         raise typer.BadParameter(f"Input file {path} does not exist")
-    return pd.read_csv(path)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        _require_pyarrow(path)
+    if config.prefilter.enabled:
+        return read_prefiltered(path, config)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        return pd.read_parquet(path), None
+    return pd.read_csv(path), None
 
 
 @app.command()
@@ -37,7 +61,9 @@ def dump_profiles(destination: Path = typer.Argument(Path("config_profiles"))):
 
 @app.command()
 def run(
-    input_file: Path = typer.Option(..., exists=True, readable=True, help="Input CSV containing biomarker pairs"),
+    input_file: Path = typer.Option(
+        ..., exists=True, readable=True, help="Input CSV or Parquet file containing biomarker pairs"
+    ),
     output_file: Path = typer.Option(Path("output/analysis.xlsx"), help="Destination Excel file"),
     config_file: Optional[Path] = typer.Option(None, help="Optional YAML configuration file"),
     profile: str = typer.Option("balanced", help="Default profile to use when configuration is partial"),
@@ -49,32 +75,44 @@ def run(
         True,
         help="Process all rows through the AI, including those that failed validation",
     ),
+    store_dir: Optional[Path] = typer.Option(
+        None,
+        help="Optional directory for a memory-mapped run store that `report` can regenerate outputs from",
+    ),
+    heartbeat_file: Optional[Path] = typer.Option(
+        None,
+        help="Append JSON-lines progress heartbeats to this file for external schedulers",
+    ),
+    heartbeat_interval: float = typer.Option(30.0, min=0.1, help="Seconds between heartbeats"),
+    prefilter: Optional[bool] = typer.Option(
+        None,
+        "--prefilter/--no-prefilter",
+        help="Drop pairs far outside the thresholds while reading (overrides prefilter.enabled)",
+    ),
 ):
     """Execute the biomarker analysis pipeline."""
 
+    if store_dir:
+        try:
+            check_run_dir(store_dir)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--store-dir") from exc
+
     config: AppConfig = load_config(config_file, profile=profile)
+    if prefilter is not None and prefilter != config.prefilter.enabled:
+        config = AppConfig.model_validate(
+            {**config.model_dump(), "prefilter": {**config.prefilter.model_dump(), "enabled": prefilter}}
+        )
     log_path = configure_logging(config.logging)
     LOGGER.info("Starting biomarker analysis run")
 
-    df = _load_dataset(input_file)
-    result = process_dataset(df, config, progress=progress)
-    LOGGER.info("Validated %s rows. %s failed quality checks.", len(df), len(result.failed_rows))
-
-    records = result.dataframe.to_dict(orient="records")
-    if include_failed and not result.failed_rows.empty:
+    df, prefilter_stats = _load_dataset(input_file, config)
+    if prefilter_stats is not None:
         LOGGER.info(
-            "Including %s quality-failed rows for rationale generation",
-            len(result.failed_rows),
-        )
-        failed_records = result.failed_rows.to_dict(orient="records")
-        for record in failed_records:
-            record.setdefault("classification", "Quality Review")
-            record.setdefault("composite_score", 0.0)
-        records.extend(failed_records)
-    elif not include_failed and not result.failed_rows.empty:
-        LOGGER.info(
-            "Skipping %s quality-failed rows from AI processing per configuration",
-            len(result.failed_rows),
+            "Prefilter kept %s of %s rows (dropped by rule: %s)",
+            prefilter_stats.rows_kept,
+            prefilter_stats.rows_read,
+            prefilter_stats.dropped_by_rule,
         )
     ai_engine = AIAnalysisEngine(
         config,
@@ -85,25 +123,161 @@ def run(
         LOGGER.warning("Dry-run enabled: using deterministic offline rationales")
     elif disable_api:
         LOGGER.info("External AI disabled by flag; using offline rationales")
+    if not include_failed:
+        LOGGER.info("Skipping quality-failed rows from AI processing per configuration")
+
+    tracker = ProgressTracker(enabled=progress, heartbeat_path=heartbeat_file, heartbeat_interval=heartbeat_interval)
+    with tracker:
+        pipeline = AnalysisPipeline(
+            config,
+            ai_engine,
+            include_failed=include_failed,
+            flagged_dir=flagged_dir,
+            tracker=tracker,
+        )
+        try:
+            output = pipeline.run(df)
+        except KeyboardInterrupt:
+            tracker.close("cancelled")
+            typer.echo("Analysis interrupted", err=True)
+            raise typer.Exit(code=130)
+
+        result = output.result
+        rationales = output.rationales
+        LOGGER.info("Validated %s rows. %s failed quality checks.", len(df), len(result.failed_rows))
+        LOGGER.info("Generated %s rationales", len(rationales))
+
+        metadata = {
+            "input_file": str(input_file),
+            "output_file": str(output_file),
+            "config_file": str(config_file) if config_file else "<default>",
+            "profile": profile,
+            "config_fingerprint": config.fingerprint,
+            "dry_run": str(dry_run),
+            "include_failed": str(include_failed),
+            "timestamp": datetime.utcnow().isoformat(),
+            "log_file": str(log_path) if log_path else "",
+        }
+        if prefilter_stats is not None:
+            metadata["prefilter"] = json.dumps(prefilter_stats.as_dict())
+
+        report_progress = tracker.stage("Report", total=2 if store_dir else 1, unit="file")
+        build_excel_report(result, rationales, output_file, config, metadata)
+        report_progress.advance(1)
+        if store_dir:
+            try:
+                save_run(store_dir, result, rationales, config, metadata)
+            except ValueError as exc:
+                raise typer.BadParameter(str(exc), param_hint="--store-dir") from exc
+            report_progress.advance(1)
+            LOGGER.info("Run store written to %s", store_dir)
+        report_progress.finish()
+
+    typer.echo("Analysis completed successfully")
+    raise typer.Exit(code=0)
+
+
+@app.command()
+def report(
+    store_dir: Path = typer.Option(..., exists=True, file_okay=False, help="Run store written by `run --store-dir`"),
+    output_file: Path = typer.Option(Path("output/analysis.xlsx"), help="Destination Excel file"),
+    flagged_dir: Path = typer.Option(Path("output/rationales"), help="Directory for flagged rationale reports"),
+):
+    """Regenerate the Excel and Markdown outputs from a saved run store."""
 
-    rationales = ai_engine.generate_rationales(records)
-    LOGGER.info("Generated %s rationales", len(rationales))
+    try:
+        store = RunStore.open(store_dir)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    config = store.config
+    configure_logging(config.logging)
+    result = store.analysis_result()
+    rationales = store.rationales()
+    LOGGER.info(
+        "Loaded %s scored rows, %s failed rows, and %s rationales from %s",
+        len(result.dataframe),
+        len(result.failed_rows),
+        len(rationales),
+        store_dir,
+    )
 
     metadata = {
-        "input_file": str(input_file),
+        **store.metadata,
         "output_file": str(output_file),
-        "config_file": str(config_file) if config_file else "<default>",
-        "profile": profile,
-        "dry_run": str(dry_run),
-        "include_failed": str(include_failed),
-        "timestamp": datetime.utcnow().isoformat(),
-        "log_file": str(log_path) if log_path else "",
+        "store_dir": str(store_dir),
+        "regenerated_at": datetime.utcnow().isoformat(),
     }
-
     build_excel_report(result, rationales, output_file, config, metadata)
     write_flagged_rationales(rationales, result, flagged_dir)
 
-    typer.echo("Analysis completed successfully")
+    typer.echo("Report regenerated successfully")
+    raise typer.Exit(code=0)
+
+
+@app.command()
+def diff(
+    before: Path = typer.Argument(..., exists=True, help="Baseline run: run store directory, Parquet, or CSV"),
+    after: Path = typer.Argument(..., exists=True, help="Comparison run: run store directory, Parquet, or CSV"),
+    output_file: Path = typer.Option(Path("output/diff.xlsx"), help="Destination Excel file for the diff report"),
+    top: int = typer.Option(50, min=1, help="Number of top movers to report"),
+):
+    """Compare classifications and composite scores between two runs."""
+
+    for path in (before, after):
+        if path.suffix.lower() in PARQUET_SUFFIXES:
+            _require_pyarrow(path)
+    try:
+        before_scores = load_run_scores(before)
+        after_scores = load_run_scores(after)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    result = diff_runs(before_scores, after_scores, top_n=top)
+    write_diff_report(
+        result,
+        output_file,
+        {"before": str(before), "after": str(after), "timestamp": datetime.utcnow().isoformat()},
+    )
+
+    typer.echo(result.transitions.to_string())
+    typer.echo(
+        f"{result.summary['reclassified']} of {result.summary['pairs_common']} common pairs changed classification; "
+        f"{result.summary['pairs_added']} added, {result.summary['pairs_removed']} removed"
+    )
+    typer.echo(f"Diff report written to {output_file}")
+    raise typer.Exit(code=0)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind; keep the default for local-only access"),
+    port: int = typer.Option(8765, min=0, max=65535, help="TCP port to listen on"),
+    config_file: Optional[Path] = typer.Option(None, help="Optional YAML configuration file"),
+    profile: str = typer.Option("balanced", help="Default profile to use when configuration is partial"),
+    disable_api: bool = typer.Option(False, help="Disable live AI calls even if credentials are available"),
+    api_concurrency: int = typer.Option(4, min=1, help="Number of AI engines (and HTTP sessions) shared by requests"),
+):
+    """Run a long-lived local scoring service (POST /score, GET /metrics, GET /health)."""
+
+    config: AppConfig = load_config(config_file, profile=profile)
+    configure_logging(config.logging)
+    server = create_server(
+        config,
+        host=host,
+        port=port,
+        enable_api=not disable_api,
+        api_concurrency=api_concurrency,
+    )
+    bound_host, bound_port = server.server_address[:2]
+    LOGGER.info("Scoring service listening on http://%s:%s", bound_host, bound_port)
+    typer.echo(f"Serving on http://{bound_host}:{bound_port} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo("Shutting down")
+    finally:
+        server.server_close()
     raise typer.Exit(code=0)
 
 
@@ -1,17 +1,22 @@
 """Configuration handling for the biomarker AI CLI."""
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError, field_validator
 
 
 class ThresholdSettings(BaseModel):
     """Statistical threshold configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     max_p_value: float = Field(..., gt=0, description="Maximum acceptable p-value")
     max_heterogeneity: float = Field(..., ge=0, le=100, description="Maximum acceptable I^2 value")
     min_studies: int = Field(..., ge=2, description="Minimum number of studies contributing to the meta-analysis")
@@ -22,6 +27,8 @@ class ThresholdSettings(BaseModel):
 class ScoringWeights(BaseModel):
     """Weighting for statistical vs biological scoring."""
 
+    model_config = ConfigDict(frozen=True)
+
     statistical: float = Field(..., ge=0, le=1)
     biological: float = Field(..., ge=0, le=1)
 
@@ -37,6 +44,8 @@ class ScoringWeights(BaseModel):
 class ClassificationThresholds(BaseModel):
     """Thresholds for Green/Amber/Red classifications."""
 
+    model_config = ConfigDict(frozen=True)
+
     green: float = Field(0.75, ge=0, le=1)
     amber: float = Field(0.5, ge=0, le=1)
 
@@ -52,6 +61,8 @@ class ClassificationThresholds(BaseModel):
 class ApiSettings(BaseModel):
     """API connectivity options for the AI analysis layer."""
 
+    model_config = ConfigDict(frozen=True)
+
     base_url: str = Field("https://api.moonshot.ai/v1", description="Base URL for the Kimi API")
     model: str = Field("kimi-k2-0905-preview", description="Model identifier to request")
     temperature: float = Field(0.6, ge=0, le=1.5)
@@ -64,21 +75,83 @@ class ApiSettings(BaseModel):
 class LoggingSettings(BaseModel):
     """Configuration for runtime logging."""
 
+    model_config = ConfigDict(frozen=True)
+
     level: str = Field("INFO")
     file: Optional[str] = None
 
 
+class PrefilterSettings(BaseModel):
+    """Early-exit filter that drops pairs far outside the statistical thresholds before validation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = False
+    p_value_factor: float = Field(10.0, ge=1, description="Drop pairs with p_ss above max_p_value times this factor")
+    heterogeneity_margin: float = Field(
+        20.0, ge=0, description="Drop pairs with dz_ss_i2 above max_heterogeneity plus this margin"
+    )
+    effect_size_factor: float = Field(
+        0.5, ge=0, le=1, description="Drop pairs with |dz_ss_mean| below min_effect_size times this factor"
+    )
+    chunk_size: int = Field(250_000, ge=1, description="Rows read per chunk when filtering CSV input")
+
+
+class EnrichmentSettings(BaseModel):
+    """Offline pathway enrichment against local GMT gene-set files."""
+
+    model_config = ConfigDict(frozen=True)
+
+    gmt_files: Tuple[str, ...] = Field((), description="GMT files to index; enrichment is off when empty")
+    max_shared_reported: int = Field(5, ge=0, description="Most specific shared pathways listed per pair")
+    batch_size: int = Field(16_384, ge=1, description="Unique gene pairs intersected per vectorised batch")
+
+
 class AppConfig(BaseModel):
-    """Root configuration model."""
+    """Root configuration model.
+
+    Configs are frozen so the cached JSON and fingerprint always describe the
+    instance; derive variants with :meth:`model_copy` or :func:`load_config`.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     thresholds: ThresholdSettings
     scoring: ScoringWeights
     classification: ClassificationThresholds = ClassificationThresholds()
     api_settings: ApiSettings = ApiSettings()
     logging: LoggingSettings = LoggingSettings()
+    prefilter: PrefilterSettings = PrefilterSettings()
+    enrichment: EnrichmentSettings = EnrichmentSettings()
     rationale_batch_size: int = Field(50, ge=1, le=200)
+    pipeline_chunk_size: int = Field(5000, ge=1, description="Rows scored per pipeline chunk")
+    pipeline_queue_depth: int = Field(4, ge=1, description="Maximum chunks buffered between pipeline stages")
     enable_external_apis: bool = Field(True, description="Whether to attempt external enrichment APIs")
 
+    _json: Optional[str] = PrivateAttr(default=None)
+    _fingerprint: Optional[str] = PrivateAttr(default=None)
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "AppConfig":
+        copy = super().model_copy(update=update, deep=deep)
+        copy._json = None
+        copy._fingerprint = None
+        return copy
+
+    def to_json(self) -> str:
+        """Return the indented JSON form of the config, serialised once per instance."""
+
+        if self._json is None:
+            self._json = json.dumps(self.model_dump(), indent=2)
+        return self._json
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable SHA-256 of the validated config, usable as a cache or run key."""
+
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(self.to_json().encode("utf-8")).hexdigest()
+        return self._fingerprint
+
 
 DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
     "balanced": {
@@ -116,23 +189,74 @@ DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
 }
 
 
-def load_config(config_path: Optional[Path], profile: str | None = None) -> AppConfig:
-    """Load configuration from file or default profiles."""
+_CACHE_LOCK = threading.Lock()
+# Resolved path -> (mtime_ns, size, sha256 of contents); avoids re-hashing unchanged files.
+_FILE_DIGESTS: Dict[str, Tuple[int, int, str]] = {}
+# (file sha256 or "", profile) -> validated config.
+_CONFIG_CACHE: Dict[Tuple[str, str], AppConfig] = {}
 
-    data: Dict[str, Any]
-    if config_path:
-        with config_path.open("r", encoding="utf-8") as fh:
-            data = yaml.safe_load(fh) or {}
-    else:
-        data = {}
+
+def _read_config_file(config_path: Path) -> Tuple[str, Optional[bytes]]:
+    """Return the content digest of ``config_path`` and its bytes if they had to be read."""
+
+    stat = config_path.stat()
+    key = str(config_path.resolve())
+    with _CACHE_LOCK:
+        cached = _FILE_DIGESTS.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2], None
+
+    raw = config_path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    with _CACHE_LOCK:
+        _FILE_DIGESTS[key] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest, raw
+
+
+def clear_config_cache() -> None:
+    """Drop all cached configurations and file digests."""
+
+    with _CACHE_LOCK:
+        _FILE_DIGESTS.clear()
+        _CONFIG_CACHE.clear()
+
+
+def load_config(config_path: Optional[Path], profile: str | None = None, use_cache: bool = True) -> AppConfig:
+    """Load configuration from file or default profiles.
+
+    Validated configs are cached by file content hash and profile name; a file
+    is only re-hashed when its mtime or size changes. Cached instances are
+    frozen and shared between callers.
+    """
 
     if profile:
         profile_key = profile.lower()
         if profile_key not in DEFAULT_PROFILES:
             raise ValueError(f"Unknown profile '{profile}'. Available: {', '.join(DEFAULT_PROFILES)}")
-        profile_data = DEFAULT_PROFILES[profile_key]
     else:
-        profile_data = DEFAULT_PROFILES["balanced"]
+        profile_key = "balanced"
+
+    raw: Optional[bytes] = None
+    digest = ""
+    if config_path:
+        digest, raw = _read_config_file(config_path)
+
+    cache_key = (digest, profile_key)
+    if use_cache:
+        with _CACHE_LOCK:
+            cached = _CONFIG_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    data: Dict[str, Any]
+    if config_path:
+        if raw is None:
+            raw = config_path.read_bytes()
+        data = yaml.safe_load(raw.decode("utf-8")) or {}
+    else:
+        data = {}
+
+    profile_data = DEFAULT_PROFILES[profile_key]
 
     merged: Dict[str, Any] = {**profile_data}
     for key, value in data.items():
@@ -142,10 +266,15 @@ def load_config(config_path: Optional[Path], profile: str | None = None) -> AppC
             merged[key] = value
 
     try:
-        return AppConfig.model_validate(merged)
+        config = AppConfig.model_validate(merged)
     except ValidationError as exc:
         raise ValueError(f"Invalid configuration: {exc}") from exc
 
+    if use_cache:
+        with _CACHE_LOCK:
+            _CONFIG_CACHE[cache_key] = config
+    return config
+
 
 def dump_default_profiles(destination: Path) -> None:
     """Write default profiles to the destination directory for reference."""
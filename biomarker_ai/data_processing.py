@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
-from .config import AppConfig
+from .config import AppConfig, ThresholdSettings
+from .enrichment import annotate_pathways, load_gene_set_index
+from .scoring import CLASSIFICATION_LABELS, ScoringFeatures
 
 
 EXPECTED_COLUMNS: Tuple[str, ...] = (
@@ -58,10 +60,134 @@ class QualityIssue:
     issues: List[str]
 
 
+# Quality rules in the order their messages are reported for a row. Each rule
+# occupies one bit of the per-row code stored in ``QualityIssueTable.codes``.
+ISSUE_RULES: Tuple[str, ...] = (
+    "pair_id_required",
+    "p_ss_required",
+    "dz_ss_mean_required",
+    "confidence_score_required",
+    "p_ss_range",
+    "p_ss_threshold",
+    "dz_ss_i2_range",
+    "dz_ss_i2_threshold",
+    "min_studies",
+    "min_effect_size",
+    "min_power_score",
+    "gene_a_symbol",
+    "gene_b_symbol",
+)
+
+RULE_BITS: Dict[str, int] = {rule: 1 << position for position, rule in enumerate(ISSUE_RULES)}
+
+# Raw inputs kept for failing rows so messages can be rendered on demand.
+ISSUE_VALUE_COLUMNS: Tuple[str, ...] = ("p_ss", "dz_ss_i2", "n_studies_ss", "dz_ss_mean", "power_score")
+
+
+def _render_issues(code: int, values: Dict[str, object], thresholds: ThresholdSettings) -> List[str]:
+    issues: List[str] = []
+    for column in MANDATORY_FIELDS:
+        if code & RULE_BITS[f"{column}_required"]:
+            issues.append(f"{column} is required")
+    if code & RULE_BITS["p_ss_range"]:
+        issues.append("p_ss must be between 0 and 1")
+    elif code & RULE_BITS["p_ss_threshold"]:
+        issues.append(f"p_ss {values['p_ss']:.3g} exceeds max threshold {thresholds.max_p_value}")
+    if code & RULE_BITS["dz_ss_i2_range"]:
+        issues.append("dz_ss_i2 must be between 0 and 100")
+    elif code & RULE_BITS["dz_ss_i2_threshold"]:
+        issues.append(
+            f"dz_ss_i2 {values['dz_ss_i2']:.2f} exceeds max heterogeneity {thresholds.max_heterogeneity}"
+        )
+    if code & RULE_BITS["min_studies"]:
+        issues.append(f"n_studies_ss {values['n_studies_ss']} is below minimum {thresholds.min_studies}")
+    if code & RULE_BITS["min_effect_size"]:
+        issues.append(
+            f"dz_ss_mean {values['dz_ss_mean']} does not meet minimum effect size {thresholds.min_effect_size}"
+        )
+    if code & RULE_BITS["min_power_score"]:
+        issues.append(f"power_score {values['power_score']} is below minimum {thresholds.min_power_score}")
+    gene_flags = [
+        column
+        for column, rule in zip(GENE_COLUMNS, ("gene_a_symbol", "gene_b_symbol"))
+        if code & RULE_BITS[rule]
+    ]
+    if gene_flags:
+        issues.append(f"Potential gene symbol issue: {', '.join(gene_flags)}")
+    return issues
+
+
+@dataclass
+class QualityIssueTable:
+    """Columnar record of quality failures, one entry per failing row.
+
+    ``codes`` holds a bitmask of :data:`ISSUE_RULES` per row and ``values`` the
+    offending inputs, so human-readable messages are only rendered when a
+    :class:`QualityIssue` view is requested. Iterating the table yields
+    :class:`QualityIssue` objects, matching the previous list-based API.
+    """
+
+    pair_ids: np.ndarray
+    codes: np.ndarray
+    values: Dict[str, np.ndarray]
+    thresholds: ThresholdSettings
+
+    @classmethod
+    def empty(cls, thresholds: ThresholdSettings) -> "QualityIssueTable":
+        return cls(
+            pair_ids=np.empty(0, dtype=object),
+            codes=np.empty(0, dtype=np.uint16),
+            values={column: np.empty(0, dtype=np.float64) for column in ISSUE_VALUE_COLUMNS},
+            thresholds=thresholds,
+        )
+
+    @classmethod
+    def concat(cls, tables: Iterable["QualityIssueTable"], thresholds: ThresholdSettings) -> "QualityIssueTable":
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            return cls.empty(thresholds)
+        return cls(
+            pair_ids=np.concatenate([table.pair_ids for table in tables]),
+            codes=np.concatenate([table.codes for table in tables]),
+            values={
+                column: np.concatenate([table.values[column] for table in tables])
+                for column in ISSUE_VALUE_COLUMNS
+            },
+            thresholds=thresholds,
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> QualityIssue:
+        values = {column: self.values[column][index].item() for column in ISSUE_VALUE_COLUMNS}
+        return QualityIssue(
+            pair_id=str(self.pair_ids[index]),
+            issues=_render_issues(int(self.codes[index]), values, self.thresholds),
+        )
+
+    def __iter__(self) -> Iterator[QualityIssue]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def counts_by_rule(self) -> Dict[str, int]:
+        """Number of failing rows that triggered each rule."""
+
+        return {rule: int(np.count_nonzero(self.codes & bit)) for rule, bit in RULE_BITS.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Render messages into a ``pair_id``/``issues`` frame for reporting."""
+
+        return pd.DataFrame(
+            [{"pair_id": issue.pair_id, "issues": "; ".join(issue.issues)} for issue in self],
+            columns=["pair_id", "issues"],
+        )
+
+
 @dataclass
 class AnalysisResult:
     dataframe: pd.DataFrame
-    quality_issues: List[QualityIssue]
+    quality_issues: QualityIssueTable
     failed_rows: pd.DataFrame
 
 
@@ -124,134 +250,117 @@ def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _validate_range(row: pd.Series, config: AppConfig) -> List[str]:
-    issues: List[str] = []
-    thresholds = config.thresholds
-
-    p_value = row.get("p_ss")
-    if pd.isna(p_value) or not (0 <= p_value <= 1):
-        issues.append("p_ss must be between 0 and 1")
-    elif p_value > thresholds.max_p_value:
-        issues.append(f"p_ss {p_value:.3g} exceeds max threshold {thresholds.max_p_value}")
+def _missing(series: pd.Series) -> np.ndarray:
+    missing = series.isna().to_numpy()
+    if not pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        missing = missing | (series == "").to_numpy(dtype=bool, na_value=False)
+    return missing
 
-    heterogeneity = row.get("dz_ss_i2")
-    if pd.isna(heterogeneity) or not (0 <= heterogeneity <= 100):
-        issues.append("dz_ss_i2 must be between 0 and 100")
-    elif heterogeneity > thresholds.max_heterogeneity:
-        issues.append(
-            f"dz_ss_i2 {heterogeneity:.2f} exceeds max heterogeneity {thresholds.max_heterogeneity}"
-        )
 
-    n_studies = row.get("n_studies_ss")
-    if pd.isna(n_studies) or n_studies < thresholds.min_studies:
-        issues.append(
-            f"n_studies_ss {n_studies} is below minimum {thresholds.min_studies}"
-        )
+def _gene_symbol_mask(series: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    flagged = np.fromiter((_flag_gene_symbol(str(value)) for value in uniques), dtype=bool, count=len(uniques))
+    return flagged[codes]
 
-    effect_size = row.get("dz_ss_mean")
-    if pd.isna(effect_size) or abs(effect_size) < thresholds.min_effect_size:
-        issues.append(
-            f"dz_ss_mean {effect_size} does not meet minimum effect size {thresholds.min_effect_size}"
-        )
 
-    power_score = row.get("power_score")
-    if pd.isna(power_score) or power_score < thresholds.min_power_score:
-        issues.append(
-            f"power_score {power_score} is below minimum {thresholds.min_power_score}"
-        )
+def _issue_codes(df: pd.DataFrame, thresholds: ThresholdSettings) -> np.ndarray:
+    """Evaluate every quality rule column-wise and return one bitmask per row."""
 
-    return issues
+    codes = np.zeros(len(df), dtype=np.uint16)
 
+    def flag(rule: str, mask: np.ndarray) -> None:
+        codes[mask] |= RULE_BITS[rule]
 
-def _validate_mandatory(row: pd.Series) -> List[str]:
-    issues: List[str] = []
     for column in MANDATORY_FIELDS:
-        if pd.isna(row.get(column)) or row.get(column) == "":
-            issues.append(f"{column} is required")
-    return issues
+        flag(f"{column}_required", _missing(df[column]))
 
+    def numeric(column: str) -> np.ndarray:
+        return df[column].to_numpy(dtype=np.float64, na_value=np.nan)
 
-def _flag_gene_symbol(symbol: str) -> bool:
-    if not symbol:
-        return True
-    clean = symbol.replace("-", "").replace("_", "")
-    return not clean.isalnum() or not clean.isupper()
+    with np.errstate(invalid="ignore"):
+        p_value = numeric("p_ss")
+        p_invalid = np.isnan(p_value) | (p_value < 0) | (p_value > 1)
+        flag("p_ss_range", p_invalid)
+        flag("p_ss_threshold", ~p_invalid & (p_value > thresholds.max_p_value))
 
+        heterogeneity = numeric("dz_ss_i2")
+        i2_invalid = np.isnan(heterogeneity) | (heterogeneity < 0) | (heterogeneity > 100)
+        flag("dz_ss_i2_range", i2_invalid)
+        flag("dz_ss_i2_threshold", ~i2_invalid & (heterogeneity > thresholds.max_heterogeneity))
 
-def _compute_statistical_score(row: pd.Series, config: AppConfig) -> float:
-    thresholds = config.thresholds
-
-    def clamp(value: float) -> float:
-        return max(0.0, min(1.0, value))
+        n_studies = numeric("n_studies_ss")
+        flag("min_studies", np.isnan(n_studies) | (n_studies < thresholds.min_studies))
 
-    p_value = row.get("p_ss", 1)
-    p_score = clamp(1 - (p_value / max(thresholds.max_p_value, 1e-6)))
+        effect_size = numeric("dz_ss_mean")
+        flag("min_effect_size", np.isnan(effect_size) | (np.abs(effect_size) < thresholds.min_effect_size))
 
-    heterogeneity = row.get("dz_ss_i2", 100)
-    heterogeneity_score = clamp(1 - (heterogeneity / max(thresholds.max_heterogeneity, 1e-6)))
+        power_score = numeric("power_score")
+        flag("min_power_score", np.isnan(power_score) | (power_score < thresholds.min_power_score))
 
-    n_studies = row.get("n_studies_ss", thresholds.min_studies)
-    studies_score = clamp((n_studies - thresholds.min_studies) / (thresholds.min_studies + 2))
+    flag("gene_a_symbol", _gene_symbol_mask(df["gene_a_name"]))
+    flag("gene_b_symbol", _gene_symbol_mask(df["gene_b_name"]))
+    return codes
 
-    effect_size = abs(row.get("dz_ss_mean", 0))
-    effect_score = clamp((effect_size - thresholds.min_effect_size) / (1.0 - thresholds.min_effect_size))
 
-    power_score = row.get("power_score", thresholds.min_power_score)
-    power_component = clamp((power_score - thresholds.min_power_score) / (1 - thresholds.min_power_score))
+def static_quality_failures(df: pd.DataFrame) -> np.ndarray:
+    """Rows that fail validation under any :class:`ThresholdSettings`.
 
-    return float((p_score + heterogeneity_score + studies_score + effect_score + power_component) / 5)
+    Covers the rules of :func:`_issue_codes` that do not compare against a
+    threshold: missing mandatory fields, out-of-range or missing statistics,
+    and gene symbol flags. Absent columns count as missing.
+    """
 
+    failed = np.zeros(len(df), dtype=bool)
 
-def _compute_biological_score(row: pd.Series) -> float:
-    def clamp(value: float) -> float:
-        return max(0.0, min(1.0, value))
+    def numeric(column: str) -> np.ndarray:
+        if column not in df.columns:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
 
-    sepsis_corr = row.get("sepsis_correlation", 0)
-    shock_corr = row.get("shock_correlation", 0)
-    delta = abs(row.get("corr_delta_relative", 0))
-    progression = row.get("progression_slope", 0)
+    for column in MANDATORY_FIELDS:
+        failed |= _missing(df[column]) if column in df.columns else True
+    with np.errstate(invalid="ignore"):
+        p_value = numeric("p_ss")
+        failed |= np.isnan(p_value) | (p_value < 0) | (p_value > 1)
+        heterogeneity = numeric("dz_ss_i2")
+        failed |= np.isnan(heterogeneity) | (heterogeneity < 0) | (heterogeneity > 100)
+    for column in ("n_studies_ss", "dz_ss_mean", "power_score"):
+        failed |= np.isnan(numeric(column))
+    for column in GENE_COLUMNS:
+        failed |= _gene_symbol_mask(df[column]) if column in df.columns else True
+    return failed
 
-    base_alignment = clamp((sepsis_corr + shock_corr) / 2)
-    differential = clamp(1 - abs(delta))
-    progression_component = clamp((progression + 1) / 2)
 
-    return float((base_alignment + differential + progression_component) / 3)
+def _flag_gene_symbol(symbol: str) -> bool:
+    if not symbol:
+        return True
+    clean = symbol.replace("-", "").replace("_", "")
+    return not clean.isalnum() or not clean.isupper()
 
 
 def enrich_scores(df: pd.DataFrame, config: AppConfig) -> pd.DataFrame:
     """Add composite scores and categorical flags to the DataFrame."""
 
-    stat_scores: List[float] = []
-    bio_scores: List[float] = []
-    for _, row in df.iterrows():
-        stat_scores.append(_compute_statistical_score(row, config))
-        bio_scores.append(_compute_biological_score(row))
+    features = ScoringFeatures.from_frame(df, quality_gates=False)
+    statistical = features.statistical_scores(config.thresholds)
+    composite = features.composite_scores(config, statistical)
+    codes = features.classification_codes(config, composite)
 
     df = df.copy()
-    df["statistical_score"] = stat_scores
-    df["biological_score"] = bio_scores
-    df["composite_score"] = (
-        df["statistical_score"] * config.scoring.statistical
-        + df["biological_score"] * config.scoring.biological
-    )
+    df["statistical_score"] = statistical
+    df["biological_score"] = features.biological
+    df["composite_score"] = composite
+    df["classification"] = np.asarray(CLASSIFICATION_LABELS, dtype=object)[codes]
 
-    def classify(score: float) -> str:
-        if score >= config.classification.green:
-            return "Green"
-        if score >= config.classification.amber:
-            return "Amber"
-        return "Red"
-
-    df["classification"] = df["composite_score"].apply(classify)
-    df["gene_symbol_flags"] = df.apply(
-        lambda row: [
-            symbol
-            for symbol in GENE_COLUMNS
-            if _flag_gene_symbol(str(row.get(symbol, "")))
-        ],
-        axis=1,
-    )
-    df["has_gene_symbol_issues"] = df["gene_symbol_flags"].apply(bool)
+    gene_codes = np.zeros(len(df), dtype=np.int8)
+    for bit, column in enumerate(GENE_COLUMNS):
+        if column in df.columns:
+            gene_codes |= _gene_symbol_mask(df[column]).astype(np.int8) << bit
+        else:
+            gene_codes |= np.int8(1 << bit)
+    flag_sets = [[column for bit, column in enumerate(GENE_COLUMNS) if code & (1 << bit)] for code in range(4)]
+    df["gene_symbol_flags"] = [list(flag_sets[code]) for code in gene_codes.tolist()]
+    df["has_gene_symbol_issues"] = gene_codes != 0
     return df
 
 
@@ -260,7 +369,11 @@ def process_dataset(
     config: AppConfig,
     progress: bool = True,
 ) -> AnalysisResult:
-    """Validate, score, and classify biomarker pairs."""
+    """Validate, score, and classify biomarker pairs.
+
+    Validation is evaluated column-wise, so ``progress`` no longer drives a
+    per-row progress bar; it is kept for call-site compatibility.
+    """
 
     structure_errors = validate_structure(df)
     if structure_errors:
@@ -268,36 +381,44 @@ def process_dataset(
 
     df = _coerce_numeric(df)
 
-    quality_issues: List[QualityIssue] = []
-    failed_rows: List[pd.Series] = []
+    thresholds = config.thresholds
+    codes = _issue_codes(df, thresholds)
+    failed_mask = codes != 0
+    failed_positions = np.flatnonzero(failed_mask)
+
+    quality_issues = QualityIssueTable(
+        pair_ids=np.array([str(pid) for pid in df["pair_id"].iloc[failed_positions].tolist()], dtype=object),
+        codes=codes[failed_positions],
+        values={column: df[column].to_numpy()[failed_positions] for column in ISSUE_VALUE_COLUMNS},
+        thresholds=thresholds,
+    )
 
-    iterator: Iterable[pd.Series]
-    if progress:
-        iterator = tqdm(df.itertuples(index=False), total=len(df), desc="Validating")
-    else:
-        iterator = df.itertuples(index=False)
+    scored_df = enrich_scores(df, config)
+    if config.enrichment.gmt_files:
+        index = load_gene_set_index(config.enrichment.gmt_files)
+        scored_df = annotate_pathways(scored_df, index, config.enrichment)
+    passed_df = scored_df[~failed_mask].copy()
+    failed_df = scored_df[failed_mask].reset_index(drop=True)
 
-    for row_tuple in iterator:
-        row = pd.Series(row_tuple._asdict())
-        issues = _validate_mandatory(row) + _validate_range(row, config)
-        gene_flags = [col for col in GENE_COLUMNS if _flag_gene_symbol(str(row.get(col, "")))]
-        if gene_flags:
-            issues.append(f"Potential gene symbol issue: {', '.join(gene_flags)}")
+    return AnalysisResult(dataframe=passed_df, quality_issues=quality_issues, failed_rows=failed_df)
 
-        if issues:
-            quality_issues.append(QualityIssue(pair_id=str(row.get("pair_id")), issues=issues))
-            failed_rows.append(row)
 
-    scored_df = enrich_scores(df, config)
+def merge_results(results: Iterable[AnalysisResult], config: AppConfig) -> AnalysisResult:
+    """Combine per-chunk analysis results into a single result."""
 
-    failed_df = (
-        pd.DataFrame(failed_rows, columns=df.columns)
-        if failed_rows
-        else pd.DataFrame(columns=df.columns)
-    )
-    if not failed_df.empty:
-        failed_df = enrich_scores(failed_df, config)
+    results = list(results)
+    if not results:
+        # Score an empty frame so the result still carries the scored schema.
+        return process_dataset(pd.DataFrame(columns=list(EXPECTED_COLUMNS)), config, progress=False)
 
-    passed_df = scored_df[~scored_df["pair_id"].isin([issue.pair_id for issue in quality_issues])].copy()
+    def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        non_empty = [frame for frame in frames if not frame.empty]
+        if not non_empty:
+            return frames[0].iloc[0:0].copy()
+        return pd.concat(non_empty, ignore_index=True)
 
-    return AnalysisResult(dataframe=passed_df, quality_issues=quality_issues, failed_rows=failed_df)
+    return AnalysisResult(
+        dataframe=_concat([result.dataframe for result in results]),
+        quality_issues=QualityIssueTable.concat((result.quality_issues for result in results), config.thresholds),
+        failed_rows=_concat([result.failed_rows for result in results]),
+    )
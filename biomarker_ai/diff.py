@@ -0,0 +1,179 @@
+"""Run-to-run comparison of classifications and composite scores."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .store import FAILED_FRAME, SCORED_FRAME, RunStore
+
+LOGGER = logging.getLogger(__name__)
+
+DIFF_COLUMNS: Tuple[str, ...] = ("pair_id", "classification", "composite_score")
+
+QUALITY_REVIEW = "Quality Review"
+ABSENT = "Absent"
+CLASSIFICATION_ORDER: Tuple[str, ...] = ("Green", "Amber", "Red", QUALITY_REVIEW, ABSENT)
+
+CSV_CHUNK_SIZE = 500_000
+
+
+@dataclass
+class RunDiff:
+    transitions: pd.DataFrame
+    top_movers: pd.DataFrame
+    added_removed: pd.DataFrame
+    summary: Dict[str, float]
+
+
+def _normalise(df: pd.DataFrame) -> pd.DataFrame:
+    missing = [c for c in DIFF_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Run is missing columns required for diffing: {', '.join(missing)}")
+    df = df.loc[:, list(DIFF_COLUMNS)]
+    missing_ids = (df["pair_id"].isna() | (df["pair_id"].astype("string") == "").fillna(False)).to_numpy(dtype=bool)
+    if missing_ids.any():
+        LOGGER.warning("Ignoring %s rows without a pair_id", int(missing_ids.sum()))
+        df = df.loc[~missing_ids]
+    classification = df["classification"].astype("string").where(
+        df["classification"].astype("string").isin(CLASSIFICATION_ORDER[:-1]), QUALITY_REVIEW
+    )
+    return pd.DataFrame(
+        {
+            "pair_id": df["pair_id"].astype(str).to_numpy(),
+            "classification": pd.Categorical(classification, categories=CLASSIFICATION_ORDER),
+            "composite_score": pd.to_numeric(df["composite_score"], errors="coerce").astype("float64").to_numpy(),
+        }
+    )
+
+
+def load_run_scores(path: Path) -> pd.DataFrame:
+    """Load the pair_id, classification, and composite score columns of a run.
+
+    ``path`` may be a run store directory, a Parquet file, or a CSV export. Only
+    the three columns needed for diffing are read; CSV input is read in chunks
+    with categorical classifications to keep peak memory bounded.
+    """
+
+    if path.is_dir():
+        store = RunStore.open(path)
+        scored = store.frame(SCORED_FRAME, columns=DIFF_COLUMNS)
+        failed = store.frame(FAILED_FRAME, columns=DIFF_COLUMNS)
+        if not failed.empty:
+            failed = failed.assign(classification=QUALITY_REVIEW)
+        frames = [frame for frame in (scored, failed) if not frame.empty]
+        df = _normalise(pd.concat(frames, ignore_index=True) if frames else scored)
+    elif path.suffix.lower() in {".parquet", ".pq"}:
+        df = _normalise(pd.read_parquet(path, columns=list(DIFF_COLUMNS)))
+    else:
+        chunks = pd.read_csv(
+            path,
+            usecols=list(DIFF_COLUMNS),
+            dtype={"pair_id": str, "classification": "category"},
+            chunksize=CSV_CHUNK_SIZE,
+        )
+        df = pd.concat((_normalise(chunk) for chunk in chunks), ignore_index=True)
+    return df
+
+
+def diff_runs(before: pd.DataFrame, after: pd.DataFrame, top_n: int = 50) -> RunDiff:
+    """Align two runs by pair_id and summarise classification and score movement."""
+
+    # Hash join on pair_id: factorise both key columns together and scatter each
+    # side into dense arrays indexed by the shared key code.
+    before_ids = before["pair_id"].to_numpy()
+    after_ids = after["pair_id"].to_numpy()
+    keys, pair_ids = pd.factorize(np.concatenate([before_ids, after_ids]))
+    if len(keys) and keys.min() < 0:
+        raise ValueError("pair_id must not be missing; load runs with load_run_scores")
+    before_keys, after_keys = keys[: len(before_ids)], keys[len(before_ids) :]
+    for label, side_keys in (("before", before_keys), ("after", after_keys)):
+        duplicates = len(side_keys) - int(np.count_nonzero(np.bincount(side_keys, minlength=len(pair_ids))))
+        if duplicates:
+            LOGGER.warning("%s duplicate pair_id rows in the %s run; keeping the last occurrence", duplicates, label)
+
+    size = len(CLASSIFICATION_ORDER)
+    absent_code = CLASSIFICATION_ORDER.index(ABSENT)
+    before_codes = np.full(len(pair_ids), absent_code, dtype=np.int64)
+    after_codes = np.full(len(pair_ids), absent_code, dtype=np.int64)
+    before_codes[before_keys] = before["classification"].cat.codes.to_numpy()
+    after_codes[after_keys] = after["classification"].cat.codes.to_numpy()
+    score_before = np.full(len(pair_ids), np.nan)
+    score_after = np.full(len(pair_ids), np.nan)
+    score_before[before_keys] = before["composite_score"].to_numpy()
+    score_after[after_keys] = after["composite_score"].to_numpy()
+
+    counts = np.bincount(before_codes * size + after_codes, minlength=size * size).reshape(size, size)
+    transitions = pd.DataFrame(counts, index=list(CLASSIFICATION_ORDER), columns=list(CLASSIFICATION_ORDER))
+    transitions.index.name = "before \\ after"
+
+    delta = score_after - score_before
+    changed = before_codes != after_codes
+    common = (before_codes != absent_code) & (after_codes != absent_code)
+    magnitude = np.where(np.isnan(delta), 0.0, np.abs(delta))
+    labels = np.asarray(CLASSIFICATION_ORDER, dtype=object)
+
+    # Only pairs present in both runs are movers: reclassified pairs rank ahead
+    # of pure score movement, then by |delta|.
+    rank_key = magnitude + (changed & common) * (np.nanmax(magnitude, initial=0.0) + 1.0)
+    candidates = _top(np.flatnonzero(common & (changed | (magnitude > 0))), rank_key, top_n)
+
+    top_movers = pd.DataFrame(
+        {
+            "pair_id": np.asarray(pair_ids, dtype=object)[candidates],
+            "classification_before": labels[before_codes[candidates]],
+            "classification_after": labels[after_codes[candidates]],
+            "composite_before": score_before[candidates],
+            "composite_after": score_after[candidates],
+            "composite_delta": delta[candidates],
+        }
+    )
+
+    # Added and removed pairs are listed separately, highest composite score first.
+    added = after_codes != absent_code
+    presence_score = np.where(added, score_after, score_before)
+    one_sided = _top(np.flatnonzero(~common), np.nan_to_num(presence_score, nan=-np.inf), top_n)
+    added_removed = pd.DataFrame(
+        {
+            "pair_id": np.asarray(pair_ids, dtype=object)[one_sided],
+            "change": np.where(added[one_sided], "added", "removed").astype(object),
+            "classification": labels[np.where(added, after_codes, before_codes)[one_sided]],
+            "composite_score": presence_score[one_sided],
+        }
+    )
+
+    common_delta = delta[common & ~np.isnan(delta)]
+    summary: Dict[str, float] = {
+        "pairs_before": int((before_codes != absent_code).sum()),
+        "pairs_after": int((after_codes != absent_code).sum()),
+        "pairs_common": int(common.sum()),
+        "pairs_added": int((before_codes == absent_code).sum()),
+        "pairs_removed": int((after_codes == absent_code).sum()),
+        "reclassified": int((changed & common).sum()),
+        "mean_delta": float(common_delta.mean()) if common_delta.size else 0.0,
+        "mean_abs_delta": float(np.abs(common_delta).mean()) if common_delta.size else 0.0,
+        "max_abs_delta": float(np.abs(common_delta).max()) if common_delta.size else 0.0,
+    }
+    return RunDiff(transitions=transitions, top_movers=top_movers, added_removed=added_removed, summary=summary)
+
+
+def _top(candidates: np.ndarray, rank_key: np.ndarray, top_n: int) -> np.ndarray:
+    """The ``top_n`` candidate positions with the largest ``rank_key``, in descending order."""
+
+    if len(candidates) > top_n:
+        candidates = candidates[np.argpartition(-rank_key[candidates], top_n - 1)[:top_n]]
+    return candidates[np.argsort(-rank_key[candidates], kind="stable")]
+
+
+def write_diff_report(diff: RunDiff, output_path: Path, metadata: Dict[str, str]) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_rows: List[Dict[str, object]] = [{"metric": k, "value": v} for k, v in {**metadata, **diff.summary}.items()]
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        pd.DataFrame(summary_rows).to_excel(writer, sheet_name="Summary", index=False)
+        diff.transitions.to_excel(writer, sheet_name="Transitions")
+        diff.top_movers.to_excel(writer, sheet_name="TopMovers", index=False)
+        diff.added_removed.to_excel(writer, sheet_name="AddedRemoved", index=False)
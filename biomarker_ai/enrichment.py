@@ -0,0 +1,267 @@
+"""Offline pathway enrichment for gene pairs using a bitset index over GMT gene sets."""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import EnrichmentSettings
+
+LOGGER = logging.getLogger(__name__)
+
+_WORD_BITS = 64
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Element-wise number of set bits in a uint64 array."""
+
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = np.ascontiguousarray(values).view(np.uint8).reshape(*values.shape, 8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    return _popcount(words).sum(axis=1)
+
+
+def _lowest_set_bits(words: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and bit position of up to ``limit`` lowest set bits per row of ``words``.
+
+    Runs one vectorised step per extracted bit (at most ``limit`` steps) instead
+    of one Python iteration per row. Results are ordered by row, then position.
+    """
+
+    rows, word_index = np.nonzero(words)
+    values = words[rows, word_index]
+    base = word_index.astype(np.int64) * _WORD_BITS
+    found_rows: List[np.ndarray] = []
+    found_positions: List[np.ndarray] = []
+    for _ in range(min(limit, _WORD_BITS)):
+        if not len(values):
+            break
+        lowest = values & (~values + np.uint64(1))
+        found_rows.append(rows)
+        found_positions.append(base + _popcount(lowest - np.uint64(1)))
+        values = values ^ lowest
+        remaining = values != 0
+        rows, base, values = rows[remaining], base[remaining], values[remaining]
+    if not found_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    rows, positions = np.concatenate(found_rows), np.concatenate(found_positions)
+    order = np.lexsort((positions, rows))
+    rows, positions = rows[order], positions[order]
+    first = np.searchsorted(rows, rows, side="left")
+    keep = (np.arange(len(rows)) - first) < limit
+    return rows[keep], positions[keep]
+
+
+def normalise_symbol(symbol: object) -> str:
+    return str(symbol).strip().upper()
+
+
+def read_gmt(path: Path) -> List[Tuple[str, List[str]]]:
+    """Parse a GMT file into ``(set name, member symbols)`` tuples."""
+
+    gene_sets: List[Tuple[str, List[str]]] = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line_number, line in enumerate(fh, start=1):
+            fields = line.rstrip("\r\n").split("\t")
+            if not fields[0].strip():
+                continue
+            if len(fields) < 3:
+                raise ValueError(f"{path}:{line_number}: expected '<name>\\t<description>\\t<genes...>'")
+            members = sorted({normalise_symbol(gene) for gene in fields[2:] if gene.strip()})
+            gene_sets.append((fields[0].strip(), members))
+    return gene_sets
+
+
+@dataclass
+class GeneSetIndex:
+    """Per-gene membership bitsets over a fixed collection of gene sets.
+
+    Bit ``j`` of a gene's row is set when the gene belongs to ``set_names[j]``.
+    Sets are numbered from smallest to largest, so the lowest shared bits of a
+    pair are its most specific shared pathways.
+    """
+
+    set_names: List[str]
+    gene_rows: Dict[str, int]
+    bits: np.ndarray
+    membership_counts: np.ndarray
+
+    @classmethod
+    def from_gene_sets(cls, gene_sets: Sequence[Tuple[str, Sequence[str]]]) -> "GeneSetIndex":
+        ordered = sorted(gene_sets, key=lambda item: (len(item[1]), item[0]))
+        gene_rows: Dict[str, int] = {}
+        rows: List[int] = []
+        columns: List[int] = []
+        for position, (_, members) in enumerate(ordered):
+            for gene in members:
+                rows.append(gene_rows.setdefault(gene, len(gene_rows)))
+                columns.append(position)
+
+        n_words = max(1, -(-len(ordered) // _WORD_BITS))
+        bits = np.zeros((len(gene_rows), n_words), dtype=np.uint64)
+        row_index = np.asarray(rows, dtype=np.int64)
+        column_index = np.asarray(columns, dtype=np.int64)
+        np.bitwise_or.at(
+            bits,
+            (row_index, column_index // _WORD_BITS),
+            np.left_shift(np.uint64(1), (column_index % _WORD_BITS).astype(np.uint64)),
+        )
+        return cls(
+            set_names=[name for name, _ in ordered],
+            gene_rows=gene_rows,
+            bits=bits,
+            membership_counts=_popcount_rows(bits),
+        )
+
+    @property
+    def n_sets(self) -> int:
+        return len(self.set_names)
+
+    def rows_for(self, symbols: Sequence[object]) -> np.ndarray:
+        """Index rows for ``symbols``; ``-1`` marks genes absent from every set."""
+
+        return np.fromiter(
+            (self.gene_rows.get(normalise_symbol(symbol), -1) for symbol in symbols),
+            dtype=np.int64,
+            count=len(symbols),
+        )
+
+
+def hypergeometric_upper_tail(total: int, a: np.ndarray, b: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """``P(X >= k)`` for ``X ~ Hypergeometric(total, a, b)``, evaluated element-wise.
+
+    Terms are computed from a log-factorial table over ``0..total`` and summed
+    per element with ``np.add.reduceat``, so the cost is proportional to the
+    total length of the tails rather than a Python loop per element.
+    """
+
+    a, b, k = (np.asarray(values, dtype=np.int64) for values in (a, b, k))
+    p_values = np.ones(len(k), dtype=np.float64)
+    upper = np.minimum(a, b)
+    active = np.flatnonzero((k > 0) & (k <= upper))
+    p_values[k > upper] = 0.0
+    if not len(active):
+        return p_values
+
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, total + 1, dtype=np.float64)))))
+
+    def log_choose(n: np.ndarray, r: np.ndarray) -> np.ndarray:
+        return log_factorial[n] - log_factorial[r] - log_factorial[n - r]
+
+    a, b, k, upper = a[active], b[active], k[active], upper[active]
+    lengths = upper - k + 1
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    owner = np.repeat(np.arange(len(active)), lengths)
+    i = k[owner] + (np.arange(lengths.sum()) - starts[owner])
+    a_t, b_t = a[owner], b[owner]
+    valid = (b_t - i) <= (total - a_t)
+    log_terms = (
+        log_choose(a_t, np.where(valid, i, 0))
+        + log_choose(total - a_t, np.where(valid, b_t - i, 0))
+        - log_choose(np.full_like(b_t, total), b_t)
+    )
+    terms = np.where(valid, np.exp(log_terms), 0.0)
+    p_values[active] = np.minimum(np.add.reduceat(terms, starts), 1.0)
+    return p_values
+
+
+def annotate_pathways(df: pd.DataFrame, index: GeneSetIndex, settings: EnrichmentSettings) -> pd.DataFrame:
+    """Add shared pathway counts, names, and enrichment p-values to ``df``.
+
+    Genes are resolved once per unique symbol and each unique gene pair is
+    intersected once, in batches of ``settings.batch_size`` pairs. The p-value
+    treats the indexed gene sets as the universe: it is the probability that two
+    genes belonging to ``a`` and ``b`` of the ``M`` sets share at least the
+    observed number of them by chance. Pairs with a gene that is in no indexed
+    set get a count of 0, no pathways, and a missing p-value.
+    """
+
+    df = df.copy()
+    if df.empty:
+        df["shared_pathway_count"] = pd.Series(dtype=np.int64)
+        df["shared_pathways"] = pd.Series(dtype=object)
+        df["pathway_enrichment_p"] = pd.Series(dtype=np.float64)
+        return df
+
+    codes, uniques = pd.factorize(pd.concat([df["gene_a_name"], df["gene_b_name"]], ignore_index=True))
+    unique_rows = np.append(index.rows_for(list(uniques)), -1)
+    gene_rows = unique_rows[codes]  # factorize marks missing symbols with -1, which hits the appended -1
+    rows_a, rows_b = gene_rows[: len(df)], gene_rows[len(df) :]
+
+    known = (rows_a >= 0) & (rows_b >= 0)
+    stride = np.int64(max(1, len(index.gene_rows)))
+    pair_keys, pair_codes = np.unique(rows_a[known] * stride + rows_b[known], return_inverse=True)
+    pair_a, pair_b = pair_keys // stride, pair_keys % stride
+
+    set_names = np.asarray(index.set_names, dtype=object)
+    shared_counts = np.zeros(len(pair_keys), dtype=np.int64)
+    # One extra slot holds the empty list used for pairs with an unknown gene.
+    shared_names = np.empty(len(pair_keys) + 1, dtype=object)
+    shared_names[:] = [[] for _ in range(len(shared_names))]
+    for start in range(0, len(pair_keys), settings.batch_size):
+        stop = start + settings.batch_size
+        shared = index.bits[pair_a[start:stop]] & index.bits[pair_b[start:stop]]
+        shared_counts[start:stop] = _popcount_rows(shared)
+        if settings.max_shared_reported:
+            rows, positions = _lowest_set_bits(shared, settings.max_shared_reported)
+            offsets = np.searchsorted(rows, np.arange(len(shared) + 1))
+            names = set_names[positions].tolist()
+            for row in np.flatnonzero(np.diff(offsets)).tolist():
+                shared_names[start + row] = names[offsets[row] : offsets[row + 1]]
+
+    membership = index.membership_counts
+    triples, triple_codes = np.unique(
+        np.stack([membership[pair_a], membership[pair_b], shared_counts], axis=1), axis=0, return_inverse=True
+    )
+    pair_p = hypergeometric_upper_tail(index.n_sets, triples[:, 0], triples[:, 1], triples[:, 2])[
+        triple_codes.reshape(-1)
+    ]
+
+    row_codes = np.full(len(df), len(pair_keys), dtype=np.int64)
+    row_codes[known] = pair_codes.reshape(-1)
+    counts = np.append(shared_counts, 0)[row_codes]
+    p_values = np.append(pair_p, np.nan)[row_codes]
+
+    df["shared_pathway_count"] = counts
+    df["shared_pathways"] = [list(names) for names in shared_names[row_codes].tolist()]
+    df["pathway_enrichment_p"] = p_values
+    return df
+
+
+_INDEX_LOCK = threading.Lock()
+# Tuple of (resolved path, mtime_ns, size) per GMT file -> built index.
+_INDEX_CACHE: Dict[Tuple[Tuple[str, int, int], ...], GeneSetIndex] = {}
+
+
+def load_gene_set_index(paths: Sequence[str]) -> GeneSetIndex:
+    """Load and index GMT files, reusing the index while the files are unchanged."""
+
+    resolved = [Path(path).expanduser().resolve() for path in paths]
+    key = tuple((str(path), path.stat().st_mtime_ns, path.stat().st_size) for path in resolved)
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(key)
+        if cached is not None:
+            return cached
+        gene_sets = [gene_set for path in resolved for gene_set in read_gmt(path)]
+        index = GeneSetIndex.from_gene_sets(gene_sets)
+        _INDEX_CACHE[key] = index
+    LOGGER.info(
+        "Indexed %s gene sets over %s genes from %s GMT file(s)", index.n_sets, len(index.gene_rows), len(resolved)
+    )
+    return index
+
+
+def clear_index_cache() -> None:
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
@@ -4,7 +4,7 @@ from __future__ import annotations
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 import pandas as pd
 
@@ -46,19 +46,14 @@ def build_excel_report(
     enriched["ai_rationale"] = enriched["pair_id"].map(_lookup_rationale)
 
     summary_df = _summary_frame(enriched)
-    quality_df = pd.DataFrame(
-        (
-            {
-                "pair_id": issue.pair_id,
-                "issues": "; ".join(issue.issues),
-            }
-            for issue in result.quality_issues
-        )
+    quality_df = result.quality_issues.to_frame()
+    issue_counts_df = pd.DataFrame(
+        [{"rule": rule, "failed_rows": count} for rule, count in result.quality_issues.counts_by_rule().items()]
     )
 
     metadata_df = pd.DataFrame(
         {
-            "config": [json.dumps(config.model_dump(), indent=2)],
+            "config": [config.to_json()],
             "run_metadata": [json.dumps(metadata, indent=2)],
         }
     )
@@ -74,6 +69,7 @@ def build_excel_report(
         enriched.to_excel(writer, sheet_name="Detailed", index=False)
         failed_rows_df.to_excel(writer, sheet_name="FailedRows", index=False)
         quality_df.to_excel(writer, sheet_name="QualityIssues", index=False)
+        issue_counts_df.to_excel(writer, sheet_name="QualityIssueCounts", index=False)
         metadata_df.to_excel(writer, sheet_name="Metadata", index=False)
 
 
@@ -81,13 +77,14 @@ def write_flagged_rationales(
     rationales: Iterable[Rationale],
     result: AnalysisResult,
     destination: Path,
+    timestamp: Optional[str] = None,
 ) -> None:
     destination.mkdir(parents=True, exist_ok=True)
     flagged_ids = set(result.failed_rows["pair_id"].astype(str))
     amber_red = set(result.dataframe[result.dataframe["classification"] != "Green"]["pair_id"].astype(str))
     focus_ids = flagged_ids | amber_red
 
-    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    timestamp = timestamp or datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
     for rationale in rationales:
         if rationale.pair_id not in focus_ids:
@@ -0,0 +1,226 @@
+"""Pipelined execution of the scoring, rationale, and writing stages."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .ai_analysis import AIAnalysisEngine, Rationale
+from .config import AppConfig
+from .data_processing import AnalysisResult, merge_results, process_dataset, validate_structure
+from .output import write_flagged_rationales
+from .progress import ProgressTracker
+
+LOGGER = logging.getLogger(__name__)
+
+_END = object()
+
+
+class PipelineCancelled(RuntimeError):
+    """Raised inside stage workers when the pipeline is being torn down."""
+
+
+@dataclass
+class _StageFailure:
+    stage: str
+    error: BaseException
+
+
+@dataclass
+class PipelineOutput:
+    result: AnalysisResult
+    rationales: List[Rationale]
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+
+class _Channel:
+    """Bounded queue whose blocking operations observe a cancellation event."""
+
+    def __init__(self, maxsize: int, cancel: threading.Event, poll_interval: float = 0.1) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._cancel = cancel
+        self._poll_interval = poll_interval
+
+    def put(self, item: Any) -> None:
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                self._queue.put(item, timeout=self._poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def get(self) -> Any:
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                return self._queue.get(timeout=self._poll_interval)
+            except queue.Empty:
+                continue
+
+
+def iter_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive row slices of ``df`` with at most ``chunk_size`` rows."""
+
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size]
+
+
+def build_rationale_records(result: AnalysisResult, include_failed: bool) -> List[Dict[str, object]]:
+    """Return the row dictionaries that should be sent for rationale generation."""
+
+    records = result.dataframe.to_dict(orient="records")
+    if include_failed and not result.failed_rows.empty:
+        failed_records = result.failed_rows.to_dict(orient="records")
+        for record in failed_records:
+            record.setdefault("classification", "Quality Review")
+            record.setdefault("composite_score", 0.0)
+        records.extend(failed_records)
+    return records
+
+
+class AnalysisPipeline:
+    """Run validation/scoring, rationale generation, and writing as overlapping stages.
+
+    Scored chunks are handed to the rationale stage through a bounded queue as
+    soon as they are ready, and completed rationales stream into the flagged
+    rationale writer on the calling thread. Queue bounds provide backpressure so
+    a fast scorer cannot run arbitrarily far ahead of the API-bound stage.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        ai_engine: AIAnalysisEngine,
+        include_failed: bool = True,
+        flagged_dir: Optional[Path] = None,
+        tracker: Optional[ProgressTracker] = None,
+    ) -> None:
+        self.config = config
+        self.ai_engine = ai_engine
+        self.include_failed = include_failed
+        self.flagged_dir = flagged_dir
+        self.tracker = tracker or ProgressTracker(enabled=False)
+
+    def run(self, df: pd.DataFrame) -> PipelineOutput:
+        structure_errors = validate_structure(df)
+        if structure_errors:
+            raise ValueError("; ".join(structure_errors))
+
+        chunk_size = self.config.pipeline_chunk_size
+        scoring_progress = self.tracker.stage("Validating/scoring", total=len(df))
+        rationale_progress = self.tracker.stage("Rationales", total=len(df) if self.include_failed else None)
+        writing_progress = self.tracker.stage("Writing", total=len(df))
+        cancel = threading.Event()
+        scored: _Channel = _Channel(self.config.pipeline_queue_depth, cancel)
+        annotated: _Channel = _Channel(self.config.pipeline_queue_depth, cancel)
+        stage_seconds: Dict[str, float] = {"scoring": 0.0, "rationales": 0.0, "writing": 0.0}
+
+        def score_stage() -> None:
+            try:
+                for chunk in iter_chunks(df, chunk_size):
+                    started = time.perf_counter()
+                    chunk_result = process_dataset(chunk, self.config, progress=False)
+                    stage_seconds["scoring"] += time.perf_counter() - started
+                    scoring_progress.advance(len(chunk), failed=len(chunk_result.failed_rows))
+                    scored.put(chunk_result)
+                scoring_progress.finish()
+                scored.put(_END)
+            except PipelineCancelled:
+                return
+            except BaseException as exc:  # propagate to the consuming thread
+                self._forward_failure(scored, "scoring", exc)
+
+        def rationale_stage() -> None:
+            batch_size = self.config.rationale_batch_size
+            try:
+                while True:
+                    item = scored.get()
+                    if item is _END or isinstance(item, _StageFailure):
+                        rationale_progress.finish()
+                        annotated.put(item)
+                        return
+                    records = build_rationale_records(item, self.include_failed)
+                    rationales: List[Rationale] = []
+                    for start in range(0, len(records), batch_size):
+                        if cancel.is_set():
+                            raise PipelineCancelled()
+                        started = time.perf_counter()
+                        batch = self.ai_engine.generate_rationales(records[start : start + batch_size])
+                        stage_seconds["rationales"] += time.perf_counter() - started
+                        api_calls = sum(1 for r in batch if r.metadata.get("used_api") == "True")
+                        rationale_progress.advance(len(batch), api_calls=api_calls, fallbacks=len(batch) - api_calls)
+                        rationales.extend(batch)
+                    annotated.put((item, rationales))
+            except PipelineCancelled:
+                return
+            except BaseException as exc:
+                self._forward_failure(annotated, "rationales", exc)
+
+        workers = [
+            threading.Thread(target=score_stage, name="biomarker-scoring", daemon=True),
+            threading.Thread(target=rationale_stage, name="biomarker-rationales", daemon=True),
+        ]
+
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        results: List[AnalysisResult] = []
+        rationales: List[Rationale] = []
+        wall_started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                item = annotated.get()
+                if item is _END:
+                    writing_progress.finish()
+                    break
+                if isinstance(item, _StageFailure):
+                    raise item.error
+                chunk_result, chunk_rationales = item
+                started = time.perf_counter()
+                if self.flagged_dir is not None:
+                    write_flagged_rationales(chunk_rationales, chunk_result, self.flagged_dir, timestamp)
+                results.append(chunk_result)
+                rationales.extend(chunk_rationales)
+                stage_seconds["writing"] += time.perf_counter() - started
+                writing_progress.advance(len(chunk_result.dataframe) + len(chunk_result.failed_rows))
+        except BaseException:
+            cancel.set()
+            LOGGER.warning("Pipeline cancelled; waiting for stage workers to stop")
+            raise
+        finally:
+            for worker in workers:
+                worker.join(timeout=5.0)
+
+        wall_seconds = time.perf_counter() - wall_started
+        LOGGER.info(
+            "Pipeline finished in %.2fs (busy: scoring %.2fs, rationales %.2fs, writing %.2fs)",
+            wall_seconds,
+            stage_seconds["scoring"],
+            stage_seconds["rationales"],
+            stage_seconds["writing"],
+        )
+        return PipelineOutput(
+            result=merge_results(results, self.config),
+            rationales=rationales,
+            stage_seconds=stage_seconds,
+            wall_seconds=wall_seconds,
+        )
+
+    @staticmethod
+    def _forward_failure(channel: _Channel, stage: str, exc: BaseException) -> None:
+        LOGGER.error("Pipeline stage '%s' failed: %s", stage, exc)
+        try:
+            channel.put(_StageFailure(stage=stage, error=exc))
+        except PipelineCancelled:
+            pass
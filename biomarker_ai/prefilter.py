@@ -0,0 +1,129 @@
+"""Early-exit filtering of clearly out-of-scope pairs while reading input files."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import AppConfig
+
+
+PREFILTER_COLUMNS: Tuple[str, ...] = ("p_ss", "dz_ss_i2", "dz_ss_mean")
+
+
+@dataclass
+class PrefilterStats:
+    rows_read: int = 0
+    rows_kept: int = 0
+    dropped_by_rule: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rows_dropped(self) -> int:
+        return self.rows_read - self.rows_kept
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows_read": self.rows_read,
+            "rows_kept": self.rows_kept,
+            "rows_dropped": self.rows_dropped,
+            "dropped_by_rule": dict(self.dropped_by_rule),
+        }
+
+
+def prefilter_limits(config: AppConfig) -> Dict[str, float]:
+    """Cut-offs beyond which a pair cannot plausibly pass validation."""
+
+    thresholds, settings = config.thresholds, config.prefilter
+    return {
+        "p_ss_max": thresholds.max_p_value * settings.p_value_factor,
+        "dz_ss_i2_max": thresholds.max_heterogeneity + settings.heterogeneity_margin,
+        "abs_dz_ss_mean_min": thresholds.min_effect_size * settings.effect_size_factor,
+    }
+
+
+def prefilter_masks(df: pd.DataFrame, config: AppConfig) -> Dict[str, np.ndarray]:
+    """Per-rule boolean masks of rows that are clearly out of scope.
+
+    Missing or unparsable values never trigger a rule, so those rows still
+    reach full validation and are reported as quality issues.
+    """
+
+    limits = prefilter_limits(config)
+
+    def numeric(column: str) -> np.ndarray:
+        if column not in df.columns:  # leave structural errors to validate_structure
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    with np.errstate(invalid="ignore"):
+        return {
+            "p_ss_far_above_max": numeric("p_ss") > limits["p_ss_max"],
+            "dz_ss_i2_far_above_max": numeric("dz_ss_i2") > limits["dz_ss_i2_max"],
+            "dz_ss_mean_far_below_min": np.abs(numeric("dz_ss_mean")) < limits["abs_dz_ss_mean_min"],
+        }
+
+
+def _accumulate(stats: PrefilterStats, masks: Dict[str, np.ndarray], rows: int) -> np.ndarray:
+    dropped = np.zeros(rows, dtype=bool)
+    for rule, mask in masks.items():
+        stats.dropped_by_rule[rule] = stats.dropped_by_rule.get(rule, 0) + int(np.count_nonzero(mask))
+        dropped |= mask
+    stats.rows_read += rows
+    stats.rows_kept += rows - int(np.count_nonzero(dropped))
+    return dropped
+
+
+def apply_prefilter(df: pd.DataFrame, config: AppConfig) -> Tuple[pd.DataFrame, PrefilterStats]:
+    """Drop clearly out-of-scope rows from an in-memory frame."""
+
+    stats = PrefilterStats()
+    dropped = _accumulate(stats, prefilter_masks(df, config), len(df))
+    return df[~dropped].reset_index(drop=True), stats
+
+
+def _parquet_filter(config: AppConfig) -> Any:
+    import pyarrow.compute as pc
+
+    limits = prefilter_limits(config)
+
+    def keep(expression: Any, column: str) -> Any:
+        return expression | pc.field(column).is_null(nan_is_null=True)
+
+    effect = pc.field("dz_ss_mean")
+    return (
+        keep(pc.field("p_ss") <= limits["p_ss_max"], "p_ss")
+        & keep(pc.field("dz_ss_i2") <= limits["dz_ss_i2_max"], "dz_ss_i2")
+        & keep(
+            (effect >= limits["abs_dz_ss_mean_min"]) | (effect <= -limits["abs_dz_ss_mean_min"]),
+            "dz_ss_mean",
+        )
+    )
+
+
+def read_prefiltered(path: Path, config: AppConfig) -> Tuple[pd.DataFrame, PrefilterStats]:
+    """Read ``path`` keeping only rows that survive the prefilter.
+
+    Parquet input pushes the predicate down to the reader so row groups whose
+    statistics rule them out are skipped; per-rule counts come from a separate
+    read of the three predicate columns only. CSV input is read in chunks of
+    ``prefilter.chunk_size`` rows and filtered chunk by chunk, so dropped rows
+    are never held in memory together.
+    """
+
+    stats = PrefilterStats()
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        predicates = pd.read_parquet(path, columns=list(PREFILTER_COLUMNS))
+        _accumulate(stats, prefilter_masks(predicates, config), len(predicates))
+        df = pd.read_parquet(path, filters=_parquet_filter(config))
+        return df.reset_index(drop=True), stats
+
+    kept: List[pd.DataFrame] = []
+    for chunk in pd.read_csv(path, chunksize=config.prefilter.chunk_size):
+        dropped = _accumulate(stats, prefilter_masks(chunk, config), len(chunk))
+        kept.append(chunk[~dropped])
+    if not kept:
+        return pd.read_csv(path, nrows=0), stats
+    return pd.concat(kept, ignore_index=True), stats
@@ -0,0 +1,155 @@
+"""Chunk-granular progress, throughput, and heartbeat reporting."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tqdm import tqdm
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StageProgress:
+    """Counters for one pipeline stage.
+
+    Callers advance the stage once per chunk or batch rather than per row, so the
+    cost of locking and refreshing the progress bar is amortised over the whole
+    chunk. ``advance`` is safe to call from worker threads.
+    """
+
+    def __init__(self, name: str, total: Optional[int], unit: str, bar: Optional[tqdm]) -> None:
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.completed = 0
+        self.counters: Dict[str, int] = {}
+        self._bar = bar
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    def advance(self, count: int = 0, **counters: int) -> None:
+        with self._lock:
+            self.completed += count
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            if self._bar is not None:
+                self._bar.update(count)
+                if self.counters:
+                    self._bar.set_postfix(self.counters, refresh=False)
+
+    def finish(self) -> None:
+        with self._lock:
+            if self._finished is None:
+                self._finished = time.monotonic()
+            if self._bar is not None:
+                self._bar.close()
+                self._bar = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = (self._finished or time.monotonic()) - self._started
+            rate = self.completed / elapsed if elapsed > 0 else 0.0
+            remaining = (self.total - self.completed) if self.total is not None else None
+            snapshot: Dict[str, Any] = {
+                "completed": self.completed,
+                "total": self.total,
+                "unit": self.unit,
+                "elapsed_seconds": round(elapsed, 3),
+                "rate_per_second": round(rate, 3),
+                "eta_seconds": round(remaining / rate, 1) if remaining is not None and rate > 0 else None,
+                "finished": self._finished is not None,
+                "counters": dict(self.counters),
+            }
+            if elapsed > 0:
+                snapshot["counter_rates_per_second"] = {
+                    key: round(value / elapsed, 3) for key, value in self.counters.items()
+                }
+            return snapshot
+
+
+class ProgressTracker:
+    """Own the progress bars for a run and optionally emit JSON-lines heartbeats.
+
+    Heartbeats are written by a background thread every ``heartbeat_interval``
+    seconds and once more when the tracker is closed, so schedulers can follow
+    long jobs by tailing ``heartbeat_path``.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        heartbeat_path: Optional[Path] = None,
+        heartbeat_interval: float = 30.0,
+    ) -> None:
+        self.enabled = enabled
+        self.heartbeat_path = heartbeat_path
+        self.heartbeat_interval = heartbeat_interval
+        self._stages: Dict[str, StageProgress] = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if heartbeat_path is not None:
+            heartbeat_path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._heartbeat_loop, name="biomarker-heartbeat", daemon=True)
+            self._thread.start()
+
+    def stage(self, name: str, total: Optional[int] = None, unit: str = "rows") -> StageProgress:
+        with self._lock:
+            existing = self._stages.get(name)
+            if existing is not None:
+                return existing
+            bar = (
+                tqdm(total=total, desc=name, unit=unit, position=len(self._stages), leave=True)
+                if self.enabled
+                else None
+            )
+            stage = StageProgress(name, total, unit, bar)
+            self._stages[name] = stage
+            return stage
+
+    def snapshot(self, status: str = "running") -> Dict[str, Any]:
+        with self._lock:
+            stages: List[StageProgress] = list(self._stages.values())
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "status": status,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+            "stages": {stage.name: stage.snapshot() for stage in stages},
+        }
+
+    def close(self, status: str = "finished") -> None:
+        with self._lock:
+            stages = list(self._stages.values())
+        for stage in stages:
+            stage.finish()
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5.0)
+            self._thread = None
+            self._write_heartbeat(status)
+
+    def __enter__(self) -> "ProgressTracker":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close("failed" if exc_type is not None else "finished")
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            self._write_heartbeat("running")
+
+    def _write_heartbeat(self, status: str) -> None:
+        if self.heartbeat_path is None:
+            return
+        try:
+            with self.heartbeat_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(self.snapshot(status)) + "\n")
+        except OSError as exc:  # pragma: no cover - filesystem error path
+            LOGGER.warning("Failed to write heartbeat to %s: %s", self.heartbeat_path, exc)
@@ -0,0 +1,212 @@
+"""Vectorised statistical/biological scoring with reusable per-dataset features."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import AppConfig, ThresholdSettings
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard for type hints only
+    from .store import RunStore
+
+QUALITY_REVIEW = "Quality Review"
+CLASSIFICATION_LABELS: Tuple[str, ...] = ("Green", "Amber", "Red", QUALITY_REVIEW)
+
+STATISTICAL_INPUTS: Tuple[str, ...] = ("p_ss", "dz_ss_i2", "n_studies_ss", "dz_ss_mean", "power_score")
+BIOLOGICAL_INPUTS: Tuple[str, ...] = (
+    "sepsis_correlation",
+    "shock_correlation",
+    "corr_delta_relative",
+    "progression_slope",
+)
+
+
+def _clamp(values: np.ndarray) -> np.ndarray:
+    # Matches the scalar ``max(0.0, min(1.0, value))`` used historically, which maps NaN to 1.0.
+    return np.where(np.isnan(values), 1.0, np.clip(values, 0.0, 1.0))
+
+
+def _column(df: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=np.float64)
+    # Coerce like ``process_dataset`` does, so unparsable values become NaN.
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def biological_scores(df: pd.DataFrame) -> np.ndarray:
+    """Config-independent biological plausibility score for every row."""
+
+    sepsis_corr = _column(df, "sepsis_correlation", 0.0)
+    shock_corr = _column(df, "shock_correlation", 0.0)
+    delta = np.abs(_column(df, "corr_delta_relative", 0.0))
+    progression = _column(df, "progression_slope", 0.0)
+
+    base_alignment = _clamp((sepsis_corr + shock_corr) / 2)
+    differential = _clamp(1 - delta)
+    progression_component = _clamp((progression + 1) / 2)
+    return (base_alignment + differential + progression_component) / 3
+
+
+@dataclass
+class ScoringFeatures:
+    """Threshold-independent scoring inputs, normalised once per dataset.
+
+    The biological score does not depend on configuration and is stored
+    directly; the statistical inputs are kept as contiguous float64 arrays with
+    missing values pre-mapped, so re-scoring under new :class:`ThresholdSettings`,
+    ``ScoringWeights`` or classification cut-offs is a single in-place pass.
+
+    ``static_failures`` marks rows that fail validation whatever the
+    thresholds; together with the threshold comparisons applied at
+    classification time it sends the same rows to ``Quality Review`` that
+    :func:`~biomarker_ai.data_processing.process_dataset` would report as
+    failed. It is ``None`` when the features were built without quality gates.
+    """
+
+    pair_ids: np.ndarray
+    p_value: np.ndarray
+    heterogeneity: np.ndarray
+    # ``None`` when the column was absent: the default then depends on the thresholds.
+    n_studies: Optional[np.ndarray]
+    abs_effect: np.ndarray
+    power: Optional[np.ndarray]
+    biological: np.ndarray
+    static_failures: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, quality_gates: bool = True) -> "ScoringFeatures":
+        from .data_processing import static_quality_failures
+
+        def sanitised(column: str, default: float, nan_as: float) -> np.ndarray:
+            # The scalar clamp scores a NaN component as 1.0. Replacing NaN with an
+            # infinity that the component formula maps to +inf lets the fused pass
+            # use a plain clip instead of re-checking NaN for every config.
+            values = np.array(_column(df, column, default), dtype=np.float64)
+            values[np.isnan(values)] = nan_as
+            return values
+
+        return cls(
+            pair_ids=df["pair_id"].to_numpy(dtype=object) if "pair_id" in df.columns else np.arange(len(df)),
+            p_value=sanitised("p_ss", 1.0, -np.inf),
+            heterogeneity=sanitised("dz_ss_i2", 100.0, -np.inf),
+            n_studies=sanitised("n_studies_ss", np.nan, np.inf) if "n_studies_ss" in df.columns else None,
+            abs_effect=np.abs(sanitised("dz_ss_mean", 0.0, np.inf)),
+            power=sanitised("power_score", np.nan, np.inf) if "power_score" in df.columns else None,
+            biological=(
+                _column(df, "biological_score", np.nan)
+                if "biological_score" in df.columns
+                else biological_scores(df)
+            ),
+            static_failures=static_quality_failures(df) if quality_gates else None,
+        )
+
+    @classmethod
+    def from_store(cls, store: "RunStore", include_failed: bool = True) -> "ScoringFeatures":
+        """Build features from the memory-mapped columns of a saved run."""
+
+        from .data_processing import GENE_COLUMNS, MANDATORY_FIELDS
+        from .store import FAILED_FRAME, SCORED_FRAME
+
+        columns = {"biological_score", *STATISTICAL_INPUTS, *MANDATORY_FIELDS, *GENE_COLUMNS}
+        frames = [store.frame(SCORED_FRAME, columns=columns)]
+        if include_failed and store.rows(FAILED_FRAME):
+            frames.append(store.frame(FAILED_FRAME, columns=columns))
+        return cls.from_frame(pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+
+    def __len__(self) -> int:
+        return len(self.biological)
+
+    def statistical_scores(self, thresholds: ThresholdSettings) -> np.ndarray:
+        total = np.zeros(len(self), dtype=np.float64)
+        component = np.empty_like(total)
+
+        def accumulate(values: np.ndarray, offset: float, divisor: float, invert: bool) -> None:
+            # component = clamp(1 - values / divisor) or clamp((values - offset) / divisor)
+            if invert:
+                np.divide(values, divisor, out=component)
+                np.subtract(1, component, out=component)
+            else:
+                np.subtract(values, offset, out=component)
+                np.divide(component, divisor, out=component)
+            np.clip(component, 0.0, 1.0, out=component)
+            np.add(total, component, out=total)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            accumulate(self.p_value, 0.0, max(thresholds.max_p_value, 1e-6), invert=True)
+            accumulate(self.heterogeneity, 0.0, max(thresholds.max_heterogeneity, 1e-6), invert=True)
+            # Absent n_studies/power columns default to the threshold itself, scoring 0.
+            if self.n_studies is not None:
+                accumulate(self.n_studies, thresholds.min_studies, thresholds.min_studies + 2, invert=False)
+            accumulate(self.abs_effect, thresholds.min_effect_size, 1.0 - thresholds.min_effect_size, invert=False)
+            if self.power is not None:
+                accumulate(self.power, thresholds.min_power_score, 1 - thresholds.min_power_score, invert=False)
+        np.divide(total, 5, out=total)
+        return total
+
+    def composite_scores(self, config: AppConfig, statistical: np.ndarray | None = None) -> np.ndarray:
+        if statistical is None:
+            statistical = self.statistical_scores(config.thresholds)
+        return statistical * config.scoring.statistical + self.biological * config.scoring.biological
+
+    def quality_failures(self, thresholds: ThresholdSettings) -> Optional[np.ndarray]:
+        """Rows that fail validation under ``thresholds``, or ``None`` without quality gates."""
+
+        if self.static_failures is None:
+            return None
+        # Missing values were mapped so that these comparisons are False for
+        # them; such rows are already covered by ``static_failures``.
+        failed = self.static_failures.copy()
+        failed |= self.p_value > thresholds.max_p_value
+        failed |= self.heterogeneity > thresholds.max_heterogeneity
+        failed |= self.abs_effect < thresholds.min_effect_size
+        if self.n_studies is not None:
+            failed |= self.n_studies < thresholds.min_studies
+        if self.power is not None:
+            failed |= self.power < thresholds.min_power_score
+        return failed
+
+    def classification_codes(self, config: AppConfig, composite: np.ndarray | None = None) -> np.ndarray:
+        """Index into :data:`CLASSIFICATION_LABELS` for every pair."""
+
+        if composite is None:
+            composite = self.composite_scores(config)
+        codes = np.full(len(composite), CLASSIFICATION_LABELS.index("Red"), dtype=np.int8)
+        codes[composite >= config.classification.amber] = CLASSIFICATION_LABELS.index("Amber")
+        codes[composite >= config.classification.green] = CLASSIFICATION_LABELS.index("Green")
+        failed = self.quality_failures(config.thresholds)
+        if failed is not None:
+            codes[failed] = CLASSIFICATION_LABELS.index(QUALITY_REVIEW)
+        return codes
+
+    def classify(self, config: AppConfig) -> pd.Categorical:
+        """Re-classify every pair under ``config`` without touching the source frame.
+
+        Pairs that would fail validation under ``config.thresholds`` are
+        labelled ``Quality Review`` unless the features were built without
+        quality gates.
+        """
+
+        return pd.Categorical.from_codes(self.classification_codes(config), categories=list(CLASSIFICATION_LABELS))
+
+    def classification_counts(self, config: AppConfig) -> Dict[str, int]:
+        counts = np.bincount(self.classification_codes(config), minlength=len(CLASSIFICATION_LABELS))
+        return dict(zip(CLASSIFICATION_LABELS, counts.tolist()))
+
+    def rescore(self, config: AppConfig) -> pd.DataFrame:
+        """Return per-pair scores and classifications under ``config``."""
+
+        statistical = self.statistical_scores(config.thresholds)
+        composite = self.composite_scores(config, statistical)
+        codes = self.classification_codes(config, composite)
+        return pd.DataFrame(
+            {
+                "pair_id": self.pair_ids,
+                "statistical_score": statistical,
+                "biological_score": self.biological,
+                "composite_score": composite,
+                "classification": np.asarray(CLASSIFICATION_LABELS, dtype=object)[codes],
+            }
+        )
@@ -0,0 +1,252 @@
+"""Long-lived local HTTP service for validating, scoring, and annotating pairs."""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from .ai_analysis import AIAnalysisEngine
+from .config import AppConfig
+from .data_processing import process_dataset
+from .pipeline import build_rationale_records
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class ServerMetrics:
+    """Thread-safe request counters and a rolling latency window."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.pairs = 0
+        self.rationales = 0
+        self.api_fallbacks = 0
+        self.in_flight = 0
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.requests += 1
+                self._latencies.append(elapsed)
+
+    def record_batch(self, pairs: int, rationales: int) -> None:
+        with self._lock:
+            self.pairs += pairs
+            self.rationales += rationales
+
+    def record_api_fallback(self) -> None:
+        with self._lock:
+            self.api_fallbacks += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            uptime = time.monotonic() - self._started
+            snapshot: Dict[str, Any] = {
+                "uptime_seconds": round(uptime, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "pairs": self.pairs,
+                "rationales": self.rationales,
+                "api_fallbacks": self.api_fallbacks,
+                "pairs_per_second": round(self.pairs / uptime, 3) if uptime else 0.0,
+            }
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+
+        snapshot.update({"latency_ms_p50": percentile(0.5), "latency_ms_p95": percentile(0.95)})
+        return snapshot
+
+
+class ScoringService:
+    """Keep configuration and AI engines warm across scoring requests.
+
+    Each :class:`AIAnalysisEngine` owns a ``requests.Session`` and so is used by
+    one request at a time; a small pool of engines lets concurrent requests
+    reuse pooled API connections without sharing sessions between threads.
+    An engine that fell back to offline rationales after an API error is
+    counted in the metrics and re-enabled before it returns to the pool, so a
+    transient failure only affects the request that hit it.
+    """
+
+    def __init__(self, config: AppConfig, enable_api: bool = True, api_concurrency: int = 4) -> None:
+        self.config = config
+        self.metrics = ServerMetrics()
+        self._engines: "queue.Queue[AIAnalysisEngine]" = queue.Queue()
+        engines = [AIAnalysisEngine(config, enable_api=enable_api) for _ in range(max(1, api_concurrency))]
+        self.api_enabled = any(engine.enable_api for engine in engines)
+        for engine in engines:
+            self._engines.put(engine)
+
+    @contextmanager
+    def _engine(self) -> Iterator[AIAnalysisEngine]:
+        engine = self._engines.get()
+        try:
+            yield engine
+        finally:
+            if engine.restore_api():
+                LOGGER.warning("AI engine fell back to offline rationales; re-enabling live calls")
+                self.metrics.record_api_fallback()
+            self._engines.put(engine)
+
+    def score(self, payload: Any) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        pairs = payload.get("pairs")
+        if not isinstance(pairs, list):
+            raise ValueError("Request body must contain a 'pairs' list")
+        annotate = _flag(payload, "annotate")
+        include_failed = _flag(payload, "include_failed")
+        if not pairs:
+            return self._response([], [], [], [])
+
+        df = pd.DataFrame.from_records(pairs)
+        result = process_dataset(df, self.config, progress=False)
+
+        rationales: List[Dict[str, Any]] = []
+        if annotate:
+            records = build_rationale_records(result, include_failed)
+            with self._engine() as engine:
+                generated = engine.generate_rationales(records)
+            rationales = [
+                {"pair_id": r.pair_id, "text": r.text, "metadata": r.metadata} for r in generated
+            ]
+
+        self.metrics.record_batch(len(df), len(rationales))
+        return self._response(
+            json.loads(result.dataframe.to_json(orient="records")),
+            json.loads(result.failed_rows.to_json(orient="records")),
+            [{"pair_id": issue.pair_id, "issues": list(issue.issues)} for issue in result.quality_issues],
+            rationales,
+        )
+
+    def _response(
+        self,
+        scored: List[Dict[str, Any]],
+        failed: List[Dict[str, Any]],
+        quality_issues: List[Dict[str, Any]],
+        rationales: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return {
+            "config_fingerprint": self.config.fingerprint,
+            "scored": scored,
+            "failed": failed,
+            "quality_issues": quality_issues,
+            "rationales": rationales,
+        }
+
+
+def _flag(payload: Dict[str, Any], key: str) -> bool:
+    value = payload.get(key, True)
+    if not isinstance(value, bool):
+        raise ValueError(f"'{key}' must be true or false, got {value!r}")
+    return value
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: "ScoringHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path == "/health":
+            service = self.server.service
+            self._send_json(
+                HTTPStatus.OK,
+                {"status": "ok", "config_fingerprint": service.config.fingerprint, "api_enabled": service.api_enabled},
+            )
+        elif self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.service.metrics.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        if self.path != "/score":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            # The body was not consumed, so the connection cannot be reused.
+            self.close_connection = True
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Request body missing, too large, or of invalid length"})
+            return
+
+        service = self.server.service
+        try:
+            with service.metrics.track():
+                payload = json.loads(self.rfile.read(length))
+                status, body = HTTPStatus.OK, service.score(payload)
+        except (ValueError, TypeError) as exc:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:  # pragma: no cover - defensive
+            LOGGER.exception("Unhandled error while scoring batch")
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+        self._send_json(status, body)
+
+    def _send_json(self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ScoringService) -> None:
+        super().__init__(address, _RequestHandler)
+        self.service = service
+
+
+def create_server(
+    config: AppConfig,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    enable_api: bool = True,
+    api_concurrency: int = 4,
+) -> ScoringHTTPServer:
+    """Build (but do not start) a scoring server bound to ``host``/``port``."""
+
+    service = ScoringService(config, enable_api=enable_api, api_concurrency=api_concurrency)
+    return ScoringHTTPServer((host, port), service)
@@ -0,0 +1,334 @@
+"""Columnar, memory-mapped persistence for analysis runs."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .ai_analysis import Rationale
+from .config import AppConfig
+from .data_processing import ISSUE_VALUE_COLUMNS, AnalysisResult, QualityIssueTable
+
+STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+SCORED_FRAME = "scored"
+FAILED_FRAME = "failed"
+ISSUES_FRAME = "quality_issues"
+RATIONALES_FRAME = "rationales"
+
+
+class StringColumn:
+    """Lazily decoded view over a UTF-8 string table with int64 offsets."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, nulls: np.ndarray) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self._nulls)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self._nulls[index]:
+            return None
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return bytes(self._data[start:end]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_list(self) -> List[Optional[str]]:
+        blob = bytes(self._data)
+        offsets = self._offsets.tolist()
+        return [
+            None if null else blob[offsets[i] : offsets[i + 1]].decode("utf-8")
+            for i, null in enumerate(self._nulls.tolist())
+        ]
+
+
+Column = Union[np.ndarray, StringColumn]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date, pd.Timedelta)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serialisable")
+
+
+def _column_kind(series: pd.Series) -> str:
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return "datetime"
+    values = series.dropna()
+    if all(isinstance(value, str) for value in values):
+        return "string"
+    return "json"
+
+
+def _write_strings(path_stem: Path, values: Sequence[Optional[str]]) -> None:
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    path_stem.with_suffix(".data.bin").write_bytes(b"".join(encoded))
+    np.save(path_stem.with_suffix(".offsets.npy"), offsets)
+    np.save(path_stem.with_suffix(".nulls.npy"), nulls)
+
+
+def _read_strings(path_stem: Path) -> StringColumn:
+    data_path = path_stem.with_suffix(".data.bin")
+    if data_path.stat().st_size:
+        data = np.memmap(data_path, dtype=np.uint8, mode="r")
+    else:
+        data = np.empty(0, dtype=np.uint8)
+    offsets = np.load(path_stem.with_suffix(".offsets.npy"), mmap_mode="r")
+    nulls = np.load(path_stem.with_suffix(".nulls.npy"), mmap_mode="r")
+    return StringColumn(data, offsets, nulls)
+
+
+def _write_frame(directory: Path, df: pd.DataFrame) -> Dict[str, Any]:
+    directory.mkdir(parents=True, exist_ok=True)
+    columns: List[Dict[str, Any]] = []
+    for position, name in enumerate(df.columns):
+        series = df[name]
+        kind = _column_kind(series)
+        stem = directory / f"c{position:04d}"
+        if kind == "numeric":
+            np.save(stem.with_suffix(".npy"), np.ascontiguousarray(series.to_numpy()))
+        elif kind == "datetime":
+            np.save(stem.with_suffix(".npy"), _datetime_to_int64(series))
+        elif kind == "string":
+            _write_strings(stem, [None if pd.isna(value) else value for value in series.tolist()])
+        else:
+            _write_strings(
+                stem,
+                [
+                    None if not isinstance(value, (list, dict)) and pd.isna(value)
+                    else json.dumps(value, default=_json_default)
+                    for value in series.tolist()
+                ],
+            )
+        columns.append({"name": str(name), "kind": kind, "file": stem.name, "dtype": str(series.dtype)})
+    return {"rows": len(df), "columns": columns}
+
+
+def _datetime_to_int64(series: pd.Series) -> np.ndarray:
+    """Nanoseconds since the epoch (UTC for tz-aware columns); NaT maps to int64 min."""
+
+    if series.dt.tz is not None:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    return np.ascontiguousarray(series.astype("datetime64[ns]").to_numpy().view(np.int64))
+
+
+def _datetime_from_int64(values: np.ndarray, dtype: str) -> pd.Series:
+    series = pd.Series(np.asarray(values).view("datetime64[ns]"))
+    restored = pd.api.types.pandas_dtype(dtype)
+    if isinstance(restored, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize("UTC").dt.tz_convert(restored.tz)
+    return series.astype(restored)
+
+
+def _quality_issue_frame(issues: QualityIssueTable) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "pair_id": pd.Series(issues.pair_ids, dtype=object),
+            "code": issues.codes,
+            **{column: issues.values[column] for column in ISSUE_VALUE_COLUMNS},
+        },
+        columns=["pair_id", "code", *ISSUE_VALUE_COLUMNS],
+    )
+
+
+def _rationale_frame(rationales: Iterable[Rationale]) -> pd.DataFrame:
+    rationales = list(rationales)
+    return pd.DataFrame(
+        {
+            "pair_id": [r.pair_id for r in rationales],
+            "text": [r.text for r in rationales],
+            "metadata": [dict(r.metadata) for r in rationales],
+        },
+        columns=["pair_id", "text", "metadata"],
+    )
+
+
+def check_run_dir(run_dir: Path) -> None:
+    """Raise ``ValueError`` unless ``run_dir`` is absent, empty, or an existing run store."""
+
+    if not run_dir.exists():
+        return
+    if not run_dir.is_dir():
+        raise ValueError(f"{run_dir} exists and is not a directory")
+    if not any(run_dir.iterdir()):
+        return
+    try:
+        with (run_dir / MANIFEST_NAME).open("r", encoding="utf-8") as fh:
+            version = json.load(fh).get("version")
+    except (OSError, ValueError, AttributeError):
+        version = None
+    if version != STORE_VERSION:
+        raise ValueError(f"Refusing to replace {run_dir}: it is not empty and is not a run store")
+
+
+def save_run(
+    run_dir: Path,
+    result: AnalysisResult,
+    rationales: Iterable[Rationale],
+    config: AppConfig,
+    metadata: Dict[str, str],
+) -> Path:
+    """Persist an analysis run to ``run_dir``, replacing a previous run store there.
+
+    The store is written to a sibling temporary directory and moved into place
+    once complete, so an interrupted write never leaves a partial store behind.
+    """
+
+    check_run_dir(run_dir)
+    run_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{run_dir.name}.", suffix=".tmp", dir=run_dir.parent))
+    try:
+        _write_run(staging, result, rationales, config, metadata)
+        if run_dir.exists():
+            previous = Path(tempfile.mkdtemp(prefix=f".{run_dir.name}.", suffix=".old", dir=run_dir.parent))
+            os.replace(run_dir, previous)
+            os.replace(staging, run_dir)
+            shutil.rmtree(previous, ignore_errors=True)
+        else:
+            os.replace(staging, run_dir)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+    return run_dir
+
+
+def _write_run(
+    run_dir: Path,
+    result: AnalysisResult,
+    rationales: Iterable[Rationale],
+    config: AppConfig,
+    metadata: Dict[str, str],
+) -> None:
+    frames = {
+        SCORED_FRAME: result.dataframe,
+        FAILED_FRAME: result.failed_rows,
+        ISSUES_FRAME: _quality_issue_frame(result.quality_issues),
+        RATIONALES_FRAME: _rationale_frame(rationales),
+    }
+    manifest = {
+        "version": STORE_VERSION,
+        "config": config.model_dump(mode="json"),
+        "metadata": metadata,
+        "frames": {name: _write_frame(run_dir / name, frame) for name, frame in frames.items()},
+    }
+    with (run_dir / MANIFEST_NAME).open("w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+
+@dataclass
+class RunStore:
+    """Read-only handle on a persisted run.
+
+    Numeric columns are returned as read-only memory maps and string columns as
+    :class:`StringColumn` views, so opening a store and touching a few columns
+    does not require reading the whole run into memory.
+    """
+
+    path: Path
+    manifest: Dict[str, Any]
+
+    @classmethod
+    def open(cls, run_dir: Path) -> "RunStore":
+        manifest_path = run_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise ValueError(f"{run_dir} is not a run store (missing {MANIFEST_NAME})")
+        with manifest_path.open("r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported run store version {manifest.get('version')!r} in {run_dir}")
+        return cls(path=run_dir, manifest=manifest)
+
+    @property
+    def config(self) -> AppConfig:
+        return AppConfig.model_validate(self.manifest["config"])
+
+    @property
+    def metadata(self) -> Dict[str, str]:
+        return dict(self.manifest.get("metadata", {}))
+
+    def rows(self, frame: str) -> int:
+        return int(self._frame_spec(frame)["rows"])
+
+    def columns(self, frame: str) -> List[str]:
+        return [column["name"] for column in self._frame_spec(frame)["columns"]]
+
+    def column(self, frame: str, name: str) -> Column:
+        for spec in self._frame_spec(frame)["columns"]:
+            if spec["name"] == name:
+                return self._load_column(frame, spec)
+        raise KeyError(f"Column '{name}' not found in frame '{frame}'")
+
+    def frame(self, frame: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        specs = self._frame_spec(frame)["columns"]
+        if columns is not None:
+            wanted = set(columns)
+            specs = [spec for spec in specs if spec["name"] in wanted]
+        data: Dict[str, Any] = {}
+        for spec in specs:
+            column = self._load_column(frame, spec)
+            if isinstance(column, StringColumn):
+                values = column.to_list()
+                if spec["kind"] == "json":
+                    values = [None if value is None else json.loads(value) for value in values]
+                    data[spec["name"]] = pd.Series(values, dtype=object)
+                else:
+                    data[spec["name"]] = pd.Series(values)
+            elif spec["kind"] == "datetime":
+                data[spec["name"]] = _datetime_from_int64(column, spec["dtype"])
+            else:
+                data[spec["name"]] = np.asarray(column)
+        return pd.DataFrame(data, columns=[spec["name"] for spec in specs], index=pd.RangeIndex(self.rows(frame)))
+
+    def analysis_result(self) -> AnalysisResult:
+        quality_issues = QualityIssueTable(
+            pair_ids=np.asarray(self.column(ISSUES_FRAME, "pair_id").to_list(), dtype=object),
+            codes=np.asarray(self.column(ISSUES_FRAME, "code")),
+            values={column: np.asarray(self.column(ISSUES_FRAME, column)) for column in ISSUE_VALUE_COLUMNS},
+            thresholds=self.config.thresholds,
+        )
+        return AnalysisResult(
+            dataframe=self.frame(SCORED_FRAME),
+            quality_issues=quality_issues,
+            failed_rows=self.frame(FAILED_FRAME),
+        )
+
+    def rationales(self) -> List[Rationale]:
+        df = self.frame(RATIONALES_FRAME)
+        return [
+            Rationale(pair_id=pair_id, text=text, metadata=metadata or {})
+            for pair_id, text, metadata in zip(df["pair_id"], df["text"], df["metadata"])
+        ]
+
+    def _frame_spec(self, frame: str) -> Dict[str, Any]:
+        try:
+            return self.manifest["frames"][frame]
+        except KeyError as exc:
+            raise KeyError(f"Frame '{frame}' not found in run store {self.path}") from exc
+
+    def _load_column(self, frame: str, spec: Dict[str, Any]) -> Column:
+        stem = self.path / frame / spec["file"]
+        if spec["kind"] in ("numeric", "datetime"):
+            return np.load(stem.with_suffix(".npy"), mmap_mode="r")
+        return _read_strings(stem)
@@ -0,0 +1,60 @@
+"""ScoringFeatures re-classification agrees with the full validation pipeline."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biomarker_ai.config import ThresholdSettings, load_config
+from biomarker_ai.data_processing import process_dataset
+from biomarker_ai.scoring import QUALITY_REVIEW, ScoringFeatures
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "raw" / "updated_biomarker_data_scored_sample.csv"
+
+
+@pytest.fixture()
+def dirty_frame() -> pd.DataFrame:
+    df = pd.read_csv(SAMPLE_CSV)
+    for column in ("p_ss", "dz_ss_i2", "power_score", "sepsis_correlation"):
+        df[column] = df[column].astype(object)
+    df.loc[0, "p_ss"] = "abc"
+    df.loc[1, "dz_ss_i2"] = "n/a"
+    df.loc[2, "power_score"] = ""
+    df.loc[3, "sepsis_correlation"] = "?"
+    return df
+
+
+def test_from_frame_coerces_unparsable_values(dirty_frame: pd.DataFrame) -> None:
+    features = ScoringFeatures.from_frame(dirty_frame)
+
+    assert len(features) == len(dirty_frame)
+    assert np.isfinite(features.biological).all()
+    assert features.static_failures is not None
+    assert features.static_failures[:3].all()
+
+
+@pytest.mark.parametrize(
+    "thresholds",
+    [
+        None,
+        ThresholdSettings(max_p_value=0.5, max_heterogeneity=100, min_studies=2, min_effect_size=0, min_power_score=0),
+        ThresholdSettings(max_p_value=1e-4, max_heterogeneity=30, min_studies=5, min_effect_size=0.5, min_power_score=0.9),
+    ],
+)
+def test_classify_matches_process_dataset(dirty_frame: pd.DataFrame, thresholds: ThresholdSettings | None) -> None:
+    config = load_config(None)
+    if thresholds is not None:
+        config = config.model_copy(update={"thresholds": thresholds})
+
+    result = process_dataset(dirty_frame.copy(), config, progress=False)
+    labels = pd.Series(
+        np.asarray(ScoringFeatures.from_frame(dirty_frame).classify(config), dtype=object),
+        index=dirty_frame["pair_id"].astype(str),
+    )
+
+    failed_ids = set(result.failed_rows["pair_id"].astype(str))
+    assert set(labels[labels == QUALITY_REVIEW].index) == failed_ids
+    passed = result.dataframe.set_index(result.dataframe["pair_id"].astype(str))["classification"]
+    assert labels[passed.index].tolist() == passed.tolist()
@@ -0,0 +1,222 @@
+"""Local-only tests for the scoring service against a stubbed Kimi backend."""
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pandas as pd
+import pytest
+
+from biomarker_ai.config import ApiSettings, load_config
+from biomarker_ai.server import create_server
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "raw" / "updated_biomarker_data_scored_sample.csv"
+
+
+class _StubKimi(HTTPServer):
+    """Minimal ``/chat/completions`` endpoint that can be told to fail."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubKimiHandler)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures_remaining = 0
+
+
+class _StubKimiHandler(BaseHTTPRequestHandler):
+    server: _StubKimi
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.calls += 1
+            fail = self.server.failures_remaining > 0
+            if fail:
+                self.server.failures_remaining -= 1
+        if fail:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        prompt = body["messages"][-1]["content"]
+        encoded = json.dumps({"choices": [{"message": {"content": f"stub rationale ({len(prompt)} chars)"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+
+def _serve(server: HTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture()
+def stub_kimi() -> Iterator[_StubKimi]:
+    stub = _StubKimi()
+    _serve(stub)
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture()
+def service_url(stub_kimi: _StubKimi, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    monkeypatch.setenv("KIMI_API_KEY", "test-key")
+    base = load_config(None)
+    config = base.model_copy(
+        update={
+            "api_settings": ApiSettings(
+                base_url=f"http://127.0.0.1:{stub_kimi.server_address[1]}",
+                retry_attempts=0,
+                timeout=5,
+            )
+        }
+    )
+    server = create_server(config, port=0, api_concurrency=2)
+    _serve(server)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def pairs() -> List[Dict[str, Any]]:
+    return json.loads(pd.read_csv(SAMPLE_CSV).to_json(orient="records"))
+
+
+def _request(url: str, data: bytes | None = None) -> Tuple[int, Dict[str, Any]]:
+    request = urllib.request.Request(url, data=data, method="POST" if data is not None else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def _score(url: str, payload: Any) -> Tuple[int, Dict[str, Any]]:
+    return _request(f"{url}/score", json.dumps(payload).encode("utf-8"))
+
+
+def test_health_reports_fingerprint_and_api_state(service_url: str) -> None:
+    status, body = _request(f"{service_url}/health")
+
+    assert status == 200
+    assert body["status"] == "ok"
+    assert len(body["config_fingerprint"]) == 64
+    assert body["api_enabled"] is True
+
+
+def test_concurrent_score_requests(service_url: str, stub_kimi: _StubKimi, pairs: List[Dict[str, Any]]) -> None:
+    batches = [pairs[i::6] for i in range(6)]
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(lambda batch: _score(service_url, {"pairs": batch}), batches))
+
+    for batch, (status, body) in zip(batches, responses):
+        assert status == 200
+        assert len(body["scored"]) + len(body["failed"]) == len(batch)
+        assert len(body["quality_issues"]) == len(body["failed"])
+        assert {r["pair_id"] for r in body["rationales"]} == {str(row["pair_id"]) for row in batch}
+        assert all(r["metadata"]["used_api"] == "True" for r in body["rationales"])
+    assert stub_kimi.calls == len(pairs)
+
+    status, metrics = _request(f"{service_url}/metrics")
+    assert status == 200
+    assert metrics["requests"] == len(batches)
+    assert metrics["errors"] == 0
+    assert metrics["pairs"] == len(pairs)
+    assert metrics["rationales"] == len(pairs)
+    assert metrics["in_flight"] == 0
+    assert metrics["api_fallbacks"] == 0
+    assert metrics["latency_ms_p95"] >= metrics["latency_ms_p50"] > 0
+
+
+def test_score_without_annotation_skips_backend(
+    service_url: str, stub_kimi: _StubKimi, pairs: List[Dict[str, Any]]
+) -> None:
+    status, body = _score(service_url, {"pairs": pairs, "annotate": False})
+
+    assert status == 200
+    assert body["rationales"] == []
+    assert stub_kimi.calls == 0
+
+
+def test_api_error_falls_back_then_recovers(
+    service_url: str, stub_kimi: _StubKimi, pairs: List[Dict[str, Any]]
+) -> None:
+    stub_kimi.failures_remaining = 1
+
+    status, degraded = _score(service_url, {"pairs": pairs[:2]})
+    assert status == 200
+    assert [r["metadata"]["used_api"] for r in degraded["rationales"]] == ["False", "False"]
+
+    _, metrics = _request(f"{service_url}/metrics")
+    assert metrics["api_fallbacks"] == 1
+
+    # Both pooled engines must be live again, whichever one serves each request.
+    for _ in range(2):
+        status, recovered = _score(service_url, {"pairs": pairs[:1]})
+        assert status == 200
+        assert recovered["rationales"][0]["metadata"]["used_api"] == "True"
+
+
+def test_empty_pairs_returns_empty_result(service_url: str) -> None:
+    status, body = _score(service_url, {"pairs": []})
+
+    assert status == 200
+    assert body["scored"] == body["failed"] == body["quality_issues"] == body["rationales"] == []
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"[1, 2]", "JSON object"),
+        (b'{"rows": []}', "'pairs' list"),
+        (b'{"pairs": {}}', "'pairs' list"),
+        (b"{not json", "Expecting property name"),
+        (b'{"pairs": [{"pair_id": "x"}]}', "Missing expected columns"),
+        (b'{"pairs": [], "annotate": "false"}', "'annotate' must be true or false"),
+        (b'{"pairs": [], "include_failed": 0}', "'include_failed' must be true or false"),
+    ],
+)
+def test_bad_requests_return_400(service_url: str, data: bytes, message: str) -> None:
+    status, body = _request(f"{service_url}/score", data)
+
+    assert status == 400
+    assert message in body["error"]
+
+
+def test_empty_body_and_unknown_paths(service_url: str) -> None:
+    assert _request(f"{service_url}/score", b"")[0] == 400
+    assert _request(f"{service_url}/nope")[0] == 404
+    assert _request(f"{service_url}/nope", b"{}")[0] == 404
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_invalid_content_length_returns_400(service_url: str, length: str) -> None:
+    host, port = service_url.removeprefix("http://").split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=30)
+    try:
+        connection.putrequest("POST", "/score")
+        connection.putheader("Content-Length", length)
+        connection.endheaders(b'{"pairs": []}')
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    finally:
+        connection.close()
+
+    assert response.status == 400
+    assert "invalid length" in body["error"]
+    assert _request(f"{service_url}/health")[0] == 200